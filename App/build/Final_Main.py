@@ -1,6 +1,15 @@
 from pathlib import Path
+import sys
 import tkinter as tk
-import subprocess
+
+# the apps run in this process: make their modules importable
+PROBLEMS = Path(__file__).resolve().parent.parent.parent / "Problems"
+for folder in (PROBLEMS, PROBLEMS / "VRP", PROBLEMS / "Production_Planning"):
+    if str(folder) not in sys.path:
+        sys.path.append(str(folder))
+
+from solver_worker import SolverWorker
+from startup import first_frame, prewarm, profile_startup
 
 class MainApplication:
     def __init__(self):
@@ -9,6 +18,11 @@ class MainApplication:
         self.window.geometry("1200x720")
         self.window.configure(bg="#23272f")
         self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        # one solver thread with a warm Gurobi environment for every hosted app
+        self.worker = SolverWorker()
+        self.apps = []
 
         # Sidebar for navigation 
         self.sidebar = tk.Frame(self.window, bg="#181c22", width=220, relief=tk.RAISED, bd=0)
@@ -40,6 +54,11 @@ class MainApplication:
             frame.place(relwidth=1, relheight=1)
 
         self.show_home()
+        self.window.after(0, self.worker.warm)
+        # solver and plotting modules of the hosted apps (not the apps: their
+        # widgets must be created on this thread)
+        prewarm(self.window, 'numpy', 'plotting',
+                'vrp_solver', 'vrp_incremental', 'pp_solver')
 
     def show_frame(self, name):
         frame = self.frames[name]
@@ -59,8 +78,16 @@ class MainApplication:
     def show_about(self): self.show_frame('AboutFrame')
 
     def run(self):
+        first_frame(self.window)
         self.window.mainloop()
 
+    def close(self):
+        # stop running solves so the worker can exit, then free the Env
+        for app in self.apps:
+            app.cancel_event.set()
+        self.worker.close()
+        self.window.destroy()
+
 class HomeFrame(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg="#2c313c")
@@ -87,9 +114,13 @@ class VRPFrame(tk.Frame):
         )
         tk.Label(self, text=desc_vrp, font=("Segoe UI",13), bg=self["bg"], fg="#ffffff", justify=tk.LEFT, wraplength=800).pack(pady=10, padx=30)
         tk.Button(self, text="Start VRP Solver", command=self.launch_vrp, bg="#00e676", fg="#23272f", font=("Segoe UI",14,"bold"), bd=0, relief=tk.FLAT, cursor="hand2", width=20, height=2).pack(pady=30)
+        self.controller = controller
 
     def launch_vrp(self):
-        subprocess.Popen(["python", str(Path(__file__).parent.parent.parent / "Problems" / "VRP" / "vrp.py")])
+        # the app replaces this page, in this process, on the shared solver worker
+        from vrp import ModernVRPApp
+        for w in self.winfo_children(): w.destroy()
+        self.controller.apps.append(ModernVRPApp(self, worker=self.controller.worker))
 
 class ProdPlanFrame(tk.Frame):
     def __init__(self, parent, controller):
@@ -103,9 +134,12 @@ class ProdPlanFrame(tk.Frame):
         )
         tk.Label(self, text=desc_pp, font=("Segoe UI",13), bg=self["bg"], fg="#ffffff", justify=tk.LEFT, wraplength=800).pack(pady=10, padx=30)
         tk.Button(self, text="Start Production Planning", command=self.launch_prodplan, bg="#00e676", fg="#23272f", font=("Segoe UI",14,"bold"), bd=0, relief=tk.FLAT, cursor="hand2", width=24, height=2).pack(pady=30)
+        self.controller = controller
 
     def launch_prodplan(self):
-        subprocess.Popen(["python", str(Path(__file__).parent.parent.parent / "Problems" / "Production_Planning" / "pp.py")])
+        from pp import ProductionPlanningApp
+        for w in self.winfo_children(): w.destroy()
+        self.controller.apps.append(ProductionPlanningApp(self, worker=self.controller.worker))
 
 class AboutFrame(tk.Frame):
     def __init__(self, parent, controller):
@@ -117,5 +151,7 @@ class AboutFrame(tk.Frame):
         tk.Button(self, text="Back to Home", command=controller.show_home, bg="#00e676", fg="#23272f", font=("Segoe UI",12,"bold"), bd=0, relief=tk.FLAT, cursor="hand2").pack(pady=30)
 
 if __name__ == "__main__":
+    if '--profile-startup' in sys.argv:
+        sys.exit(profile_startup(__file__))
     app = MainApplication()
     app.run()
\ No newline at end of file
@@ -1,24 +1,54 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-from gurobipy import Model, GRB
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
 import json
 from tkinter import filedialog
+import queue
+import sys
+import threading
+import time
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from paged_table import PagedTable
+from solution_cache import SolutionCache
+from startup import first_frame, lazy, prewarm, profile_startup
+from telemetry import emit
+
+# solver and plotting modules load on first use, or in the background once
+# the window is up, instead of before it appears
+np = lazy('numpy')
+plotting = lazy('plotting')
+pp_solver = lazy('pp_solver')
+instance_io = lazy('instance_io')
+PREWARM = ('numpy', 'plotting', 'pp_solver')
+
 # Dark mode with green accent
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("green")
 
+METHODS = {'LP (Gurobi)': 'lp', 'Native (no solver)': 'native'}
+SWEEPS = {'Demand scale': 'demand_scale', 'Production cost': 'prod_cost', 'Inventory cost': 'inv_cost',
+          'Initial inventory': 'init_inv', 'Production cap': 'prod_cap', 'Inventory cap': 'inv_cap'}
+INSTANCE_FILES = [('Instances', '*.json *.csv *.npz *.npy'), ('JSON files', '*.json'), ('CSV files', '*.csv'),
+                  ('NumPy arrays', '*.npz *.npy')]
+# the period menu (and one entry row per period) goes up to
+MAX_PERIODS = 12
+# seconds; the only way to stop a solve that HiGHS runs
+TIME_LIMIT = 60
+# longer plans are summarised rather than listed period by period
+MAX_LISTED = 100
+
 class ProductionPlanningApp:
-    def __init__(self, root):
+    # root: a window of its own, or a frame of the dashboard; worker: a shared
+    # solver_worker.SolverWorker (solves then run on its warm Gurobi Env)
+    def __init__(self, root, worker=None):
         self.root = root
-        self.root.title("Production Planning")
-        self.root.geometry("700x700")
-        self.root.configure(bg="#23272f")
+        self.worker = worker
+        if isinstance(root, (tk.Tk, tk.Toplevel)):
+            self.root.title("Production Planning")
+            self.root.geometry("700x700")
+            self.root.configure(bg="#23272f")
 
         # Header
         header = ctk.CTkFrame(self.root, fg_color="#181c22")
@@ -47,9 +77,12 @@ class ProductionPlanningApp:
             frame_period,
             values=[str(i) for i in range(2, 13)],
             variable=self.periods_var,
-            command=self.update_inputs
+            command=self.change_periods
         )
         self.period_menu.pack(side=tk.LEFT, padx=5)
+        ctk.CTkLabel(frame_period, text="Method:").pack(side=tk.LEFT, padx=5)
+        self.method_var = tk.StringVar(value='LP (Gurobi)')
+        ctk.CTkOptionMenu(frame_period, values=list(METHODS), variable=self.method_var).pack(side=tk.LEFT, padx=5)
 
         # Cost inputs
         frame_cost = ctk.CTkFrame(self.container)
@@ -94,15 +127,57 @@ class ProductionPlanningApp:
         )
         self.solve_btn.pack(pady=10)
 
+        # Live progress of the background solve
+        progress_frame = ctk.CTkFrame(self.container)
+        progress_frame.pack(fill=tk.X, pady=5)
+        self.progress_label = ctk.CTkLabel(progress_frame, text="")
+        self.progress_label.pack(side=tk.LEFT, padx=10)
+        self.cancel_btn = ctk.CTkButton(progress_frame, text="Cancel", command=self.cancel_solve, width=100, state='disabled')
+        self.cancel_btn.pack(side=tk.RIGHT, padx=10, pady=5)
+
+        # What-if sweep: one parameter over a range, the model is built once
+        sweep_frame = ctk.CTkFrame(self.container)
+        sweep_frame.pack(fill=tk.X, pady=5)
+        ctk.CTkLabel(sweep_frame, text="What-if:").pack(side=tk.LEFT, padx=5)
+        self.sweep_param_var = tk.StringVar(value='Demand scale')
+        ctk.CTkOptionMenu(sweep_frame, values=list(SWEEPS), variable=self.sweep_param_var, width=140).pack(side=tk.LEFT, padx=5)
+        ctk.CTkLabel(sweep_frame, text="From:").pack(side=tk.LEFT, padx=5)
+        self.sweep_from_var = tk.DoubleVar(value=0.8)
+        ctk.CTkEntry(sweep_frame, textvariable=self.sweep_from_var, width=60).pack(side=tk.LEFT, padx=5)
+        ctk.CTkLabel(sweep_frame, text="To:").pack(side=tk.LEFT, padx=5)
+        self.sweep_to_var = tk.DoubleVar(value=1.2)
+        ctk.CTkEntry(sweep_frame, textvariable=self.sweep_to_var, width=60).pack(side=tk.LEFT, padx=5)
+        ctk.CTkLabel(sweep_frame, text="Steps:").pack(side=tk.LEFT, padx=5)
+        self.sweep_steps_var = tk.IntVar(value=21)
+        ctk.CTkEntry(sweep_frame, textvariable=self.sweep_steps_var, width=50).pack(side=tk.LEFT, padx=5)
+        self.sweep_btn = ctk.CTkButton(sweep_frame, text="Run Sweep", command=self.run_sweep, width=110)
+        self.sweep_btn.pack(side=tk.RIGHT, padx=10, pady=5)
+
+        self.solver_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.cache = SolutionCache()
+        # multi-product config loaded from file (edited in JSON, not in the form)
+        self.plant_cfg = None
+
         self.outputs_frame = ctk.CTkFrame(self.container)
         self.outputs_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        # text and figure of the outputs, created by the first result and reused
+        self.output_txt = self.plot = None
 
         self.update_inputs()
+        prewarm(self.root, *PREWARM)
+
+    def change_periods(self, _=None):
+        self.plant_cfg = None
+        self.update_inputs()
 
     def update_inputs(self, _=None):
         # clear old entries
         for w in self.input_frame.winfo_children():
             w.destroy()
+        if self.plant_cfg is not None:
+            self.show_plant(self.plant_cfg)
+            return
         # headers
         header = ctk.CTkLabel(self.input_frame, text="Period    Demand", font=ctk.CTkFont(size=14))
         header.pack(anchor="w", padx=10)
@@ -117,73 +192,30 @@ class ProductionPlanningApp:
             entry.pack(side=tk.LEFT, padx=5)
             self.demand_vars.append(var)
 
-    def solve(self):
-        try:
-            T = self.periods_var.get()
-            demands = [var.get() for var in self.demand_vars]
-            prod_cost = self.prod_cost_var.get()
-            inv_cost = self.inv_cost_var.get()
-            init_inv = self.init_inv_var.get()
-            prod_cap = self.prod_cap_var.get()
-            inv_cap = self.inv_cap_var.get()
-
-            # create model
-            model = Model("ProductionPlanning")
-            x = model.addVars(T, lb=0, vtype=GRB.CONTINUOUS, name="prod")
-            I = model.addVars(T, lb=0, vtype=GRB.CONTINUOUS, name="inv")
-
-            # capacity constraints
-            for t in range(T):
-                model.addConstr(x[t] <= prod_cap, name=f"prod_cap_{t}")
-                model.addConstr(I[t] <= inv_cap, name=f"inv_cap_{t}")
-
-            # inventory balance
-            for t in range(T):
-                if t == 0:
-                    model.addConstr(I[t] == init_inv + x[t] - demands[t])
-                else:
-                    model.addConstr(I[t] == I[t-1] + x[t] - demands[t])
-
-            # objective: minimize production + inventory costs
-            obj = prod_cost * x.sum() + inv_cost * I.sum()
-            model.setObjective(obj, GRB.MINIMIZE)
-
-            model.optimize()
-
-            if model.status in (GRB.OPTIMAL, GRB.TIME_LIMIT):
-                prod = [x[t].X for t in range(T)]
-                inv = [I[t].X for t in range(T)]
-                cost = model.objVal
-
-                # display text
-                for w in self.outputs_frame.winfo_children(): w.destroy()
-                text = f"Total Cost: {cost:.2f}\n"
-                for t in range(T):
-                    text += f"P{t+1}: Prod={prod[t]:.2f}, Inv={inv[t]:.2f}\n"
-                label = ctk.CTkTextbox(self.outputs_frame, width=560, height=150)
-                label.insert("0.0", text)
-                label.configure(state="disabled")
-                label.pack(padx=10, pady=5)
-
-                # plot
-                fig, ax = plt.subplots(figsize=(5,3))
-                ax.plot(range(1, T+1), prod, marker='o', label='Production')
-                ax.plot(range(1, T+1), inv, marker='x', label='Inventory')
-                ax.set_xlabel('Period')
-                ax.set_ylabel('Quantity')
-                ax.set_title('Production and Inventory Levels')
-                ax.legend()
-                canvas = FigureCanvasTkAgg(fig, master=self.outputs_frame)
-                canvas.draw()
-                canvas.get_tk_widget().pack(padx=10, pady=5)
+    def show_plant(self, cfg):
+        # summary and a paged, read-only table of the demands (one row per
+        # product and period), however large the plan
+        products = cfg.get('products') or [dict(cfg, name=cfg.get('name') or 'Product')]
+        resources = cfg.get('resources', [])
+        T = int(cfg.get('periods', max(len(pr.get('demands', [])) for pr in products)))
+        if 'products' in cfg:
+            summary = f"Multi-product plan: {len(products)} products, {len(resources)} shared resources, {T} periods"
+        else:
+            summary = f"Single-product plan: {T} periods"
+        ctk.CTkLabel(self.input_frame, text=summary, font=ctk.CTkFont(size=14)).pack(anchor="w", padx=10, pady=5)
 
-            else:
-                messagebox.showerror("Error", "No optimal solution found.")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        def row(i):
+            p, t = divmod(i, T)
+            d = products[p].get('demands', [])
+            return products[p].get('name', f'Product{p+1}'), t + 1, float(d[t]) if t < len(d) else ''
 
-    def save_config(self):
-        config = {
+        PagedTable(self.input_frame, ('Product', 'Period', 'Demand'), len(products) * T, row).pack(
+            fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def get_config(self):
+        if self.plant_cfg is not None:
+            return self.plant_cfg
+        return {
             'periods': self.periods_var.get(),
             'prod_cost': self.prod_cost_var.get(),
             'inv_cost': self.inv_cost_var.get(),
@@ -192,35 +224,191 @@ class ProductionPlanningApp:
             'inv_cap': self.inv_cap_var.get(),
             'demands': [v.get() for v in self.demand_vars]
         }
-        fn = filedialog.asksaveasfilename(defaultextension='.json', filetypes=[('JSON files','*.json')])
+
+    def solve(self):
+        try:
+            cfg = self.get_config()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.solve_btn.configure(state='disabled', text='Solving...')
+        self.cancel_btn.configure(state='normal')
+        self.progress_label.configure(text='Building model...')
+        self.cancel_event = threading.Event()
+        method = METHODS[self.method_var.get()]
+        self.start(self.solve_worker, cfg, method)
+        self.root.after(100, self.poll_solver)
+
+    def start(self, target, *args):
+        # on the shared solver thread when hosted by the dashboard
+        if self.worker is not None:
+            self.worker.submit(target, *args)
+        else:
+            threading.Thread(target=target, args=args, daemon=True).start()
+
+    def solve_worker(self, cfg, method, env=None):
+        try:
+            result = pp_solver.solve(cfg, method=method, progress=lambda info: self.solver_queue.put(('progress', info)),
+                           cancel=self.cancel_event, cache=self.cache, env=env, time_limit=TIME_LIMIT)
+            self.solver_queue.put(('done', result))
+        except Exception as e:
+            self.solver_queue.put(('error', e))
+
+    def poll_solver(self):
+        try:
+            while True:
+                kind, payload = self.solver_queue.get_nowait()
+                if kind == 'progress':
+                    if 'backend' in payload:
+                        # HiGHS reports nothing until it is done and cannot be stopped
+                        self.cancel_btn.configure(state='disabled')
+                        text = f'Solving with HiGHS (no live progress, up to {TIME_LIMIT}s)...'
+                    elif 'point' in payload:
+                        text = f"Point {payload['point']}/{payload['points']} ({payload['value']:.4g})"
+                    else:
+                        text = f"Objective: {payload['objective']:.2f} | {payload['runtime']:.1f}s"
+                    self.progress_label.configure(text=text)
+                    continue
+                self.solve_btn.configure(state='normal', text='Solve')
+                self.sweep_btn.configure(state='normal', text='Run Sweep')
+                self.cancel_btn.configure(state='disabled')
+                highs = kind == 'done' and payload.get('backend') == 'highs'
+                self.progress_label.configure(text='Solved with HiGHS' if highs else '')
+                if kind == 'error':
+                    messagebox.showerror("Error", str(payload))
+                elif kind == 'sweep':
+                    self.show_sweep(payload)
+                else:
+                    self.show_plan(payload)
+                return
+        except queue.Empty:
+            pass
+        self.root.after(100, self.poll_solver)
+
+    def run_sweep(self):
+        try:
+            cfg = self.get_config()
+            values = np.linspace(self.sweep_from_var.get(), self.sweep_to_var.get(), self.sweep_steps_var.get()).tolist()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.solve_btn.configure(state='disabled')
+        self.sweep_btn.configure(state='disabled', text='Sweeping...')
+        self.cancel_btn.configure(state='normal')
+        self.progress_label.configure(text='Building model...')
+        self.cancel_event = threading.Event()
+        args = (cfg, SWEEPS[self.sweep_param_var.get()], values, METHODS[self.method_var.get()])
+        self.start(self.sweep_worker, *args)
+        self.root.after(100, self.poll_solver)
+
+    def sweep_worker(self, cfg, parameter, values, method, env=None):
+        try:
+            result = pp_solver.sweep(cfg, parameter, values, method=method,
+                           progress=lambda info: self.solver_queue.put(('progress', info)), cancel=self.cancel_event,
+                           env=env)
+            self.solver_queue.put(('sweep', result))
+        except Exception as e:
+            self.solver_queue.put(('error', e))
+
+    def cancel_solve(self):
+        self.cancel_event.set()
+        self.progress_label.configure(text='Cancelling...')
+
+    def show_plan(self, result):
+        record = result.get('telemetry')
+        if result['objective'] is None:
+            emit(record)
+            messagebox.showerror("Error", result.get('message', "No optimal solution found."))
+            return
+        clock = time.perf_counter()
+        prod, inv, cost = result['production'], result['inventory'], result['objective']
+        text = f"Total Cost: {cost:.2f}\n"
+        if 'products' in result:
+            # per-product totals, then plant-wide levels per period
+            for name, p, i in zip(result['products'], prod, inv):
+                text += f"{name}: Prod={sum(p):.2f}, Avg Inv={np.mean(i) if i else 0:.2f}\n"
+            prod, inv = np.sum(prod, axis=0), np.sum(inv, axis=0)
+        T = len(prod)
+
+        # display text
+        if T <= MAX_LISTED:
+            text += ''.join(f"P{t+1}: Prod={prod[t]:.2f}, Inv={inv[t]:.2f}\n" for t in range(T))
+        else:
+            text += f"{T} periods: Prod={np.sum(prod):.2f}, Avg Inv={np.mean(inv):.2f} (see the plot)\n"
+        self.show_output(text)
+
+        # plot
+        self.plot.show(np.arange(1, T+1), {'Production': prod, 'Inventory': inv}, 'Period', 'Quantity',
+                       'Production and Inventory Levels')
+        # draw now, so the time below is the plotting's
+        self.root.update_idletasks()
+        if record is not None:
+            record['phases']['plotting'] = time.perf_counter() - clock
+        emit(record)
+
+    def show_output(self, text):
+        if self.output_txt is None:
+            self.output_txt = ctk.CTkTextbox(self.outputs_frame, width=560, height=150)
+            self.output_txt.pack(padx=10, pady=5)
+            self.plot = plotting.LineFigure(self.outputs_frame)
+        self.output_txt.configure(state="normal")
+        self.output_txt.delete("0.0", tk.END)
+        self.output_txt.insert("0.0", text)
+        self.output_txt.configure(state="disabled")
+
+    def show_sweep(self, result):
+        points = result['points']
+        label_of = {v: k for k, v in SWEEPS.items()}
+        name = label_of.get(result['parameter'], result['parameter'])
+
+        # table
+        text = f"{name:>18} | {'Status':>10} | {'Total Cost':>12} | Iterations\n"
+        for pt in points:
+            cost = f"{pt['objective']:.2f}" if pt['objective'] is not None else '-'
+            text += f"{pt['value']:>18.4g} | {pt['status']:>10} | {cost:>12} | {pt['iterations']}\n"
+        text += f"Solve time: {result['timings'].get('solve', 0):.3f}s for {len(points)} points\n"
+        self.show_output(text)
+
+        # plot cost vs parameter (infeasible points are left out)
+        feasible = [pt for pt in points if pt['objective'] is not None]
+        self.plot.show([pt['value'] for pt in feasible], {'Total Cost': [pt['objective'] for pt in feasible]}, name,
+                       'Total Cost', 'What-if Sweep', markers=('.',))
+
+    def save_config(self):
+        config = self.get_config()
+        fn = filedialog.asksaveasfilename(defaultextension='.json', filetypes=[('JSON files','*.json'), ('Compressed NumPy','*.npz')])
         if not fn:
             return
         try:
-            with open(fn, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4)
+            if fn.lower().endswith('.npz'):
+                instance_io.save_pp_npz(fn, config)
+            else:
+                with open(fn, 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=4, default=lambda a: a.tolist())
             messagebox.showinfo('Saved', 'Configuration saved successfully.')
         except Exception as e:
             messagebox.showerror('Error', f'Failed to save configuration:\n{e}')
 
     def load_config(self):
         examples_dir = Path(__file__).parent / 'PPexemples'
-        fn = filedialog.askopenfilename(initialdir=str(examples_dir.resolve()), filetypes=[('JSON files','*.json')])
+        fn = filedialog.askopenfilename(initialdir=str(examples_dir.resolve()), filetypes=INSTANCE_FILES)
         if not fn:
             return
         try:
-            raw = Path(fn).read_bytes()
-            # decode JSON robustly
-            try:
-                content = raw.decode('utf-8-sig')
-            except:
-                try:
-                    content = raw.decode('utf-8')
-                except:
-                    content = raw.decode('latin-1')
-            cfg = json.loads(content)
+            # costs and caps missing from the file are taken from the form
+            cfg = instance_io.load_pp(fn, prod_cost=self.prod_cost_var.get(), inv_cost=self.inv_cost_var.get(),
+                                      init_inv=self.init_inv_var.get(), prod_cap=self.prod_cap_var.get(),
+                                      inv_cap=self.inv_cap_var.get())
         except Exception as e:
-            messagebox.showerror('Error', f'Failed to parse configuration:\n{e}')
+            messagebox.showerror('Error', f'Failed to load configuration:\n{e}')
+            return
+        periods = int(cfg.get('periods', len(cfg.get('demands', []))))
+        if 'products' in cfg or not fn.lower().endswith('.json') or periods > MAX_PERIODS:
+            self.plant_cfg = cfg
+            self.update_inputs()
+            messagebox.showinfo('Loaded', 'Configuration loaded successfully!')
             return
+        self.plant_cfg = None
         # populate fields
         self.periods_var.set(cfg.get('periods', self.periods_var.get()))
         self.prod_cost_var.set(cfg.get('prod_cost', self.prod_cost_var.get()))
@@ -236,6 +424,9 @@ class ProductionPlanningApp:
         messagebox.showinfo('Loaded', 'Configuration loaded successfully!')
 
 if __name__ == "__main__":
+    if '--profile-startup' in sys.argv:
+        sys.exit(profile_startup(__file__))
     root = ctk.CTk()
     app = ProductionPlanningApp(root)
+    first_frame(root)
     root.mainloop()
\ No newline at end of file
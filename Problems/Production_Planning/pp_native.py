@@ -0,0 +1,51 @@
+import numpy as np
+
+TOL = 1e-9
+
+
+def plan(demands, prod_cap, inv_cap, init_inv):
+    # Exact O(T) plan for the single-item model with non-negative unit costs:
+    # holding stock only costs, so the cheapest plan keeps every end-of-period
+    # inventory at its smallest feasible level. Two lower bounds apply:
+    #   - stock built ahead for later periods whose demand exceeds capacity,
+    #     L[t] = max(0, max_{s>t} C[s] - C[t]) with C the prefix sums of d - cap;
+    #   - initial stock that cannot have been consumed yet, init_inv - D[t].
+    # Production follows from the balance equation.
+    # Works row-wise on (..., T) demand arrays, so many items are planned in one call.
+    # Returns (production, inventory, violation, kind): violation is the first
+    # infeasible period (0-based) of each item or -1, kind names the binding
+    # capacity ('prod_cap' or 'inv_cap', None when feasible).
+    d = np.asarray(demands, dtype=float)
+    cap = np.asarray(prod_cap, dtype=float)[..., None]
+    S = np.asarray(inv_cap, dtype=float)[..., None]
+    I0 = np.asarray(init_inv, dtype=float)[..., None]
+    T = d.shape[-1]
+    if T == 0:
+        return d.copy(), d.copy(), np.full(d.shape[:-1], -1), np.full(d.shape[:-1], None)
+
+    C = np.cumsum(d - cap, axis=-1)
+    # max over s >= t of C[s], then shifted so position t holds max over s > t
+    ahead = np.flip(np.maximum.accumulate(np.flip(C, axis=-1), axis=-1), axis=-1)
+    later = np.concatenate([ahead[..., 1:], np.full(C.shape[:-1] + (1,), -np.inf)], axis=-1)
+    inventory = np.maximum(np.maximum(later - C, 0.0), I0 - np.cumsum(d, axis=-1))
+    previous = np.concatenate([np.broadcast_to(I0, d.shape[:-1] + (1,)), inventory[..., :-1]], axis=-1)
+    production = inventory - previous + d
+
+    # production capacity fails at the first period whose cumulative demand
+    # exceeds initial stock plus cumulative capacity; inventory capacity fails
+    # where even the smallest feasible stock is above the cap
+    short = C > I0 + TOL * np.maximum(1.0, np.abs(C))
+    over = inventory > S + TOL * np.maximum(1.0, S)
+    first_short = np.where(short.any(axis=-1), short.argmax(axis=-1), T)
+    first_over = np.where(over.any(axis=-1), over.argmax(axis=-1), T)
+    violation = np.minimum(first_short, first_over)
+    kind = np.where(violation == T, None, np.where(first_short <= first_over, 'prod_cap', 'inv_cap'))
+    violation = np.where(violation == T, -1, violation)
+    return np.clip(production, 0.0, None), inventory, violation, kind
+
+
+def applicable(p):
+    # the closed form relies on non-negative costs and demands, and on products
+    # being independent (no shared resources); anything else goes to the LP
+    return (not p['resources'] and (p['prod_cost'] >= 0).all() and (p['inv_cost'] >= 0).all()
+            and (p['demands'] >= 0).all())
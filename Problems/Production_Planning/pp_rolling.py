@@ -0,0 +1,162 @@
+import argparse
+import json
+import sys
+import time
+from collections import deque
+import numpy as np
+from gurobipy import GRB, Model
+import pp_native
+from pp_solver import STATUS_NAMES, add_to_gurobi, balance_rhs, build_lp, parse_config
+from instance_io import read_json
+
+
+def follow(path, poll=1.0, stop=None):
+    # Demand rows read from a text file, one period per line with one value per
+    # product (comma or space separated; blank lines and # comments skipped).
+    # With `poll` set the file is tailed like `tail -f` until `stop` (a
+    # threading.Event) is set; with poll=None reading stops at end of file.
+    buffer = ''
+    with open(path, encoding='utf-8') as f:
+        while True:
+            chunk = f.readline()
+            if chunk:
+                buffer += chunk
+                if not buffer.endswith('\n'):
+                    continue  # the writer has not finished this line yet
+                line, buffer = buffer.strip(), ''
+            elif poll is None or (stop is not None and stop.is_set()):
+                line, buffer = buffer.strip(), ''
+                if line and not line.startswith('#'):
+                    yield [float(v) for v in line.replace(',', ' ').split()]
+                return
+            else:
+                time.sleep(poll)
+                continue
+            if line and not line.startswith('#'):
+                yield [float(v) for v in line.replace(',', ' ').split()]
+
+
+def rolling_horizon(cfg, demands, window=12, method='lp', verbose=False, cancel=None):
+    # Streams a plan: `demands` is any iterable of per-period demands (a number,
+    # or one value per product for a multi-product cfg); cfg supplies costs,
+    # caps, initial inventory and resources, its own demands are ignored.
+    # Each step optimizes the next `window` periods, commits the first one and
+    # carries its ending inventory forward. The LP is built once; a step only
+    # rewrites the balance right-hand sides and re-optimizes from the previous
+    # basis, so time and memory per step do not depend on the stream length.
+    # Past the end of the stream the window is padded with zero demand.
+    # Yields one dict per committed period; stops after an infeasible window.
+    if method not in ('lp', 'native'):
+        raise ValueError(f"Unknown method: {method}")
+    if any(np.ndim(res.get('capacity', 0)) for res in cfg.get('resources', [])):
+        raise ValueError('Rolling horizon needs constant resource capacities')
+    template = dict(cfg, periods=window)
+    if 'products' in cfg:
+        template['products'] = [dict(pr, demands=[0.0] * window) for pr in cfg['products']]
+    else:
+        template['demands'] = [0.0] * window
+    p = parse_config(template)
+    P, n = len(p['names']), len(p['names']) * window
+    native = method == 'native' and pp_native.applicable(p)
+
+    def row(item):
+        d = np.atleast_1d(np.asarray(item, dtype=float))
+        if d.shape != (P,):
+            raise ValueError(f'Expected {P} demand values per period, got {d.size}')
+        if native and (d < 0).any():
+            raise ValueError('Negative demand in stream (use method="lp")')
+        return d
+
+    stream = iter(demands)
+    upcoming = deque(maxlen=window)
+    remaining = 0  # real (not padded) periods in the window
+    for item in stream:
+        upcoming.append(row(item))
+        remaining += 1
+        if remaining == window:
+            break
+    while len(upcoming) < window:
+        upcoming.append(np.zeros(P))
+
+    if not native:
+        model = Model("RollingHorizon")
+        model.setParam('OutputFlag', int(verbose))
+        v = add_to_gurobi(model, build_lp(p), 'plan')
+        model.update()
+        x, I = v[:n], v[n:]
+        balance = model.getConstrs()[:n]
+
+    period = 0
+    while remaining > 0:
+        if cancel is not None and cancel.is_set():
+            return
+        clock = time.perf_counter()
+        p['demands'] = np.array(upcoming).T
+        if native:
+            prod, inv, violation, _ = pp_native.plan(p['demands'], p['prod_cap'], p['inv_cap'], p['init_inv'])
+            status = 'optimal' if (violation < 0).all() else 'infeasible'
+        else:
+            model.setAttr('RHS', balance, balance_rhs(p).tolist())
+            model.optimize()
+            status = STATUS_NAMES.get(model.status, str(model.status))
+            if model.status == GRB.OPTIMAL:
+                prod, inv = x.X.reshape(P, window), I.X.reshape(P, window)
+        period += 1
+        step = {'period': period, 'status': status, 'demand': p['demands'][:, 0].tolist()}
+        if status == 'optimal':
+            # commit the first period of the window
+            committed_prod, committed_inv = prod[:, 0], inv[:, 0]
+            step.update({
+                'production': committed_prod.tolist(),
+                'inventory': committed_inv.tolist(),
+                'cost': float(p['prod_cost'] @ committed_prod + p['inv_cost'] @ committed_inv),
+                'window_objective': float((p['prod_cost'] @ prod).sum() + (p['inv_cost'] @ inv).sum()),
+            })
+        step['runtime'] = time.perf_counter() - clock
+        if not p['multi']:
+            for key in ('demand', 'production', 'inventory'):
+                if key in step:
+                    step[key] = step[key][0]
+        yield step
+        if status != 'optimal':
+            return
+
+        p['init_inv'] = committed_inv
+        remaining -= 1
+        for item in stream:
+            upcoming.append(row(item))
+            remaining += 1
+            break
+        else:
+            upcoming.append(np.zeros(P))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rolling-horizon production planning over a demand stream.')
+    parser.add_argument('config', help='JSON config with costs, caps, initial inventory (demands are ignored)')
+    parser.add_argument('forecast', help="demand file, one period per line ('-' for stdin)")
+    parser.add_argument('-w', '--window', type=int, default=12, help='periods optimized at each step')
+    parser.add_argument('--method', choices=['lp', 'native'], default='lp')
+    parser.add_argument('--follow', type=float, metavar='SECONDS',
+                        help='keep reading the forecast file as it grows, polling every SECONDS')
+    parser.add_argument('-o', '--out', help='JSON lines output (default: stdout)')
+    args = parser.parse_args(argv)
+
+    cfg = read_json(args.config)
+    if args.forecast == '-':
+        demands = ([float(v) for v in line.replace(',', ' ').split()] for line in sys.stdin
+                   if line.strip() and not line.startswith('#'))
+    else:
+        demands = follow(args.forecast, poll=args.follow)
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    try:
+        for step in rolling_horizon(cfg, demands, window=args.window, method=args.method):
+            out.write(json.dumps(step) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
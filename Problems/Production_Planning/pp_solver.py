@@ -0,0 +1,378 @@
+import sys
+import time
+from pathlib import Path
+import numpy as np
+import scipy.sparse as sp
+import pp_native
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from matrix_form import LinearProgram, RowBuilder, add_to_gurobi, pick_backend, solve_highs
+from solution_cache import canonical_hash
+from telemetry import Telemetry
+
+# gurobipy is only imported to build a Gurobi model: the HiGHS backend and
+# the closed-form plan do without it. Gurobi status codes (GRB.OPTIMAL,
+# GRB.TIME_LIMIT, GRB.INFEASIBLE, GRB.INF_OR_UNBD, GRB.UNBOUNDED,
+# GRB.INTERRUPTED)
+STATUS_NAMES = {
+    2: 'optimal',
+    9: 'time_limit',
+    3: 'infeasible',
+    4: 'infeasible',
+    5: 'unbounded',
+    11: 'interrupted',
+}
+
+
+def parse_config(cfg):
+    # P products x T periods; a legacy single-product config (no "products"
+    # list) is one product whose fields are the top-level keys. Top-level
+    # costs and caps also serve as defaults for the products that omit them.
+    products = cfg.get('products')
+    multi = products is not None
+    if not multi:
+        products = [dict(cfg, name=cfg.get('name') or 'Product')]
+    names = [pr.get('name') or f'Product{i+1}' for i, pr in enumerate(products)]
+    if len(set(names)) != len(names):
+        raise ValueError('Product names must be unique')
+    demands = [np.asarray(pr.get('demands', []), dtype=float) for pr in products]
+    T = int(cfg.get('periods', max((len(d) for d in demands), default=0)))
+    for name, d in zip(names, demands):
+        if len(d) < T:
+            raise ValueError(f'{name}: {T} periods but only {len(d)} demands')
+
+    def field(key, default):
+        return np.array([float(pr.get(key, cfg.get(key, default))) for pr in products])
+
+    index = {name: i for i, name in enumerate(names)}
+    resources = []
+    for r, res in enumerate(cfg.get('resources', [])):
+        rname = res.get('name') or f'Resource{r+1}'
+        applies_to = res.get('applies_to', 'production')
+        if applies_to not in ('production', 'inventory'):
+            raise ValueError(f"{rname}: applies_to must be 'production' or 'inventory'")
+        # usage: {product name: units of resource per unit} or a list in product order
+        usage = res.get('usage', {})
+        coef = np.zeros(len(names))
+        if isinstance(usage, dict):
+            for name, u in usage.items():
+                if name not in index:
+                    raise ValueError(f"{rname}: unknown product '{name}'")
+                coef[index[name]] = float(u)
+        elif len(usage) == len(names):
+            coef[:] = [float(u) for u in usage]
+        else:
+            raise ValueError(f'{rname}: {len(usage)} usage values for {len(names)} products')
+        if 'capacity' not in res:
+            raise ValueError(f'{rname}: missing capacity')
+        # capacity: one value for every period or one per period
+        cap = np.asarray(res['capacity'], dtype=float)
+        if cap.ndim == 0:
+            cap = np.full(T, float(cap))
+        elif len(cap) < T:
+            raise ValueError(f'{rname}: {T} periods but only {len(cap)} capacities')
+        resources.append({'name': rname, 'applies_to': applies_to, 'usage': coef, 'capacity': cap[:T]})
+
+    return {
+        'T': T,
+        'multi': multi,
+        'names': names,
+        'demands': np.array([d[:T] for d in demands]).reshape(len(names), T),
+        'prod_cost': field('prod_cost', 1.0),
+        'inv_cost': field('inv_cost', 0.5),
+        'init_inv': field('init_inv', 0.0),
+        'prod_cap': field('prod_cap', 1000000.0),
+        'inv_cap': field('inv_cap', 1000000.0),
+        'resources': resources,
+    }
+
+
+def instance_signature(value):
+    # JSON-friendly copy of a parsed instance with floats rounded, for the cache key
+    if isinstance(value, dict):
+        return {k: instance_signature(v) for k, v in value.items()}
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [instance_signature(v) for v in value]
+    return round(value, 9) if isinstance(value, float) else value
+
+
+def balance_rhs(p):
+    rhs = -p['demands'].ravel()
+    rhs[::max(p['T'], 1)] += p['init_inv']
+    return rhs
+
+
+def build_lp(p):
+    # columns: prod[p, t] at p * T + t, then inv[p, t] at P * T + p * T + t;
+    # per-product capacities are variable bounds
+    T, P = p['T'], len(p['names'])
+    n = P * T
+    pt = np.arange(n)
+    first = pt % max(T, 1) == 0
+    rows = RowBuilder(2 * n)
+    # inventory balance: I[p,t] - I[p,t-1] - x[p,t] = -d[p,t]   (I[p,-1] = init_inv[p])
+    later = pt[~first]
+    rows.add(np.concatenate([pt, pt, later]), np.concatenate([n + pt, pt, n + later - 1]),
+             np.concatenate([np.ones(n), -np.ones(n), -np.ones(len(later))]), '=', balance_rhs(p))
+    # shared resources (rows n + r * T .. n + (r + 1) * T - 1 for resource r): sum_p usage[p] * x[p,t] (or I[p,t]) <= capacity[t]
+    for res in p['resources']:
+        block = sp.kron(sp.csr_matrix(res['usage'][None, :]), sp.identity(T, format='csr'))
+        rows.add_matrix(block, '<', res['capacity'], col=0 if res['applies_to'] == 'production' else n)
+    A, sense, rhs = rows.build()
+    # objective: minimize production + inventory costs
+    c = np.concatenate([np.repeat(p['prod_cost'], T), np.repeat(p['inv_cost'], T)])
+    ub = np.concatenate([np.repeat(p['prod_cap'], T), np.repeat(p['inv_cap'], T)])
+    return LinearProgram(c, A, sense, rhs, np.zeros(2 * n), ub, np.full(2 * n, 'C'))
+
+
+def plan_result(p, status, production=None, inventory=None, **extra):
+    # production/inventory are (P, T) arrays; a legacy config gets flat lists back
+    result = {'status': status, 'objective': None, 'production': None, 'inventory': None}
+    if p['multi']:
+        result['products'] = p['names']
+    if production is not None:
+        result['objective'] = float((p['prod_cost'] @ production).sum() + (p['inv_cost'] @ inventory).sum())
+        if p['multi']:
+            result['production'] = production.tolist()
+            result['inventory'] = inventory.tolist()
+            result['resource_usage'] = {
+                res['name']: (res['usage'] @ (production if res['applies_to'] == 'production' else inventory)).tolist()
+                for res in p['resources']
+            }
+        else:
+            result['production'] = production[0].tolist()
+            result['inventory'] = inventory[0].tolist()
+    result.update(extra)
+    return result
+
+
+def solve_native(p, tel):
+    with tel.phase('optimize'):
+        production, inventory, violation, kind = pp_native.plan(p['demands'], p['prod_cap'], p['inv_cap'], p['init_inv'])
+    timings = tel.phases
+    bad = np.flatnonzero(violation >= 0)
+    if len(bad):
+        i = bad[0]
+        period, kind = int(violation[i]) + 1, kind[i]
+        what = 'production capacity' if kind == 'prod_cap' else 'inventory capacity'
+        if p['multi']:
+            what += f" of {p['names'][i]}"
+        violation = {'period': period, 'constraint': kind}
+        if p['multi']:
+            violation['product'] = p['names'][i]
+        return report(plan_result(p, 'infeasible', runtime=timings['optimize'], timings=timings, violation=violation,
+                                  message=f'Infeasible: {what} exceeded in period {period}'), p, tel)
+    return report(plan_result(p, 'optimal', production, inventory, runtime=timings['optimize'], timings=timings), p, tel)
+
+
+def report(result, p, tel, **fields):
+    # result['telemetry']: phases, model size and solver statistics of this solve
+    result['telemetry'] = tel.record(status=result['status'], objective=result['objective'],
+                                     size={'products': len(p['names']), 'periods': p['T'],
+                                           'resources': len(p['resources'])}, **fields)
+    return result
+
+
+def solve(cfg, method='lp', progress=None, cancel=None, verbose=True, cache=None, env=None, backend=None,
+          time_limit=None):
+    # method: 'lp' or 'native' (closed-form plan, no model at all; falls back
+    # to the LP when costs or demands are negative). backend: 'gurobi',
+    # 'highs' or 'auto' (Gurobi when its licence takes the LP's size), by
+    # default the config's "backend" key, else Gurobi. HiGHS has no progress
+    # or cancel, only time_limit (seconds, both backends): `progress` gets
+    # {'backend': 'highs'} before it starts
+    if method not in ('lp', 'native'):
+        raise ValueError(f"Unknown method: {method}")
+    # wall time of each phase (result['timings']) and solver statistics
+    # (result['telemetry'], see telemetry.py)
+    backend = backend or cfg.get('backend', 'gurobi')
+    tel = Telemetry('pp', method=method, backend=backend if method == 'lp' else '')
+    timings = tel.phases
+    with tel.phase('parse'):
+        p = parse_config(cfg)
+    T = p['T']
+    if method == 'native' and pp_native.applicable(p):
+        tel.labels['method'] = 'native'
+        return solve_native(p, tel)
+    tel.labels.update(method='lp', backend=backend)
+
+    # cache: same instance -> stored plan; same dimensions -> starting basis
+    near = None
+    if cache is not None:
+        key = canonical_hash(instance_signature(p))
+        family = canonical_hash({'T': T, 'products': len(p['names']), 'resources': len(p['resources'])})
+        hit = cache.get('pp', key)
+        if hit:
+            return report(dict(hit['result'], runtime=0.0, cached=True, timings=timings), p, tel, cached=True)
+        near = cache.nearest('pp', family)
+
+    # create model: one matrix call instead of a constraint per period
+    # ('build' includes the 'variables' and 'constraints' phases)
+    clock = time.perf_counter()
+    lp = build_lp(p)
+    n = len(p['names']) * T
+    if pick_backend(lp, backend) == 'highs':
+        tel.labels['backend'] = 'highs'
+        timings['build'] = time.perf_counter() - clock
+        tel.program(lp)
+        if progress is not None:
+            progress({'backend': 'highs', 'runtime': 0.0})
+        with tel.phase('optimize'):
+            res = solve_highs(lp, time_limit, verbose=verbose)
+        tel.highs_search(res)
+        if res['x'] is None:
+            return report(plan_result(p, res['status'], runtime=res['runtime'], timings=timings, backend='highs'),
+                          p, tel)
+        with tel.phase('extract'):
+            result = plan_result(p, res['status'], res['x'][:n].reshape(-1, T), res['x'][n:].reshape(-1, T),
+                                 runtime=res['runtime'], timings=timings, backend='highs')
+        if cache is not None and res['status'] == 'optimal':
+            cache.put('pp', key, family, {
+                'status': res['status'],
+                'result': {k: v for k, v in result.items() if k not in ('runtime', 'timings')},
+                'vbasis': [], 'cbasis': [],
+            })
+        return report(result, p, tel)
+    tel.labels['backend'] = 'gurobi'
+    from gurobipy import GRB, Model
+    model = Model("ProductionPlanning", env=env)
+    model.setParam('OutputFlag', int(verbose))
+    if time_limit is not None:
+        model.setParam('TimeLimit', time_limit)
+    v = add_to_gurobi(model, lp, 'plan', tel)
+    x, I = v[:n], v[n:]
+
+    callback = None
+    if progress is not None or cancel is not None:
+        def callback(model, where):
+            if where != GRB.Callback.SIMPLEX:
+                return
+            if cancel is not None and cancel.is_set():
+                model.terminate()
+            if progress is not None:
+                progress({'objective': model.cbGet(GRB.Callback.SPX_OBJVAL),
+                          'runtime': model.cbGet(GRB.Callback.RUNTIME)})
+
+    model.update()
+    timings['build'] = time.perf_counter() - clock
+    if near and len(near['vbasis']) == model.NumVars and len(near['cbasis']) == model.NumConstrs:
+        model.setAttr('VBasis', model.getVars(), near['vbasis'])
+        model.setAttr('CBasis', model.getConstrs(), near['cbasis'])
+
+    with tel.phase('optimize'):
+        model.optimize(callback)
+    tel.gurobi_search(model)
+
+    status = STATUS_NAMES.get(model.status, str(model.status))
+    if model.status not in (GRB.OPTIMAL, GRB.TIME_LIMIT) or model.SolCount == 0:
+        return report(plan_result(p, status, runtime=model.Runtime, timings=timings, backend='gurobi'), p, tel)
+    with tel.phase('extract'):
+        result = plan_result(p, status, x.X.reshape(-1, T), I.X.reshape(-1, T), runtime=model.Runtime,
+                             timings=timings, backend='gurobi')
+        result['objective'] = model.ObjVal
+    if cache is not None and model.status == GRB.OPTIMAL:
+        cache.put('pp', key, family, {
+            'status': status,
+            'result': {k: v for k, v in result.items() if k not in ('runtime', 'timings')},
+            'vbasis': model.getAttr('VBasis', model.getVars()),
+            'cbasis': model.getAttr('CBasis', model.getConstrs()),
+        })
+    return report(result, p, tel)
+
+
+SWEEP_PARAMETERS = ('demand_scale', 'prod_cost', 'inv_cost', 'init_inv', 'prod_cap', 'inv_cap')
+
+
+def with_parameter(p, parameter, value):
+    # copy of a parsed instance with one parameter changed: 'demand_scale'
+    # multiplies every demand, 'resource:<name>' sets that resource's capacity
+    # in every period, the others set the field for every product
+    q = dict(p)
+    if parameter == 'demand_scale':
+        q['demands'] = p['demands'] * value
+    elif parameter.startswith('resource:'):
+        name = parameter.split(':', 1)[1]
+        if name not in [res['name'] for res in p['resources']]:
+            raise ValueError(f"Unknown resource: {name}")
+        q['resources'] = [dict(res, capacity=np.full(p['T'], float(value))) if res['name'] == name else res
+                          for res in p['resources']]
+    elif parameter in SWEEP_PARAMETERS:
+        q[parameter] = np.full(len(p['names']), float(value))
+    else:
+        raise ValueError(f"Unknown parameter: {parameter}")
+    return q
+
+
+def sweep(cfg, parameter, values, method='lp', progress=None, cancel=None, verbose=False, env=None):
+    # What-if analysis: solve the instance once per value of one parameter.
+    # The LP is built once; every point only rewrites the right-hand sides,
+    # objective coefficients or bounds it changes and re-optimizes from the
+    # previous basis. Returns {'parameter', 'points': [{'value', 'status',
+    # 'objective', 'runtime', 'iterations'}], 'timings'}.
+    if method not in ('lp', 'native'):
+        raise ValueError(f"Unknown method: {method}")
+    timings = {}
+    clock = time.perf_counter()
+    p = parse_config(cfg)
+    T, n = p['T'], len(p['names']) * p['T']
+    with_parameter(p, parameter, 1.0)  # validates the parameter name
+    timings['parse'] = time.perf_counter() - clock
+    points = []
+
+    # the closed form stays valid as long as no swept value makes a cost or a demand negative
+    native = method == 'native' and pp_native.applicable(p) and (
+        parameter not in ('demand_scale', 'prod_cost', 'inv_cost') or min(values, default=0) >= 0)
+    if native:
+        clock = time.perf_counter()
+        for value in values:
+            if cancel is not None and cancel.is_set():
+                break
+            r = solve_native(with_parameter(p, parameter, value), Telemetry('pp', method='native'))
+            points.append({'value': value, 'status': r['status'], 'objective': r['objective'],
+                           'runtime': r['runtime'], 'iterations': 0})
+            if progress is not None:
+                progress({'point': len(points), 'points': len(values), 'value': value, 'objective': r['objective']})
+        timings['solve'] = time.perf_counter() - clock
+        return {'parameter': parameter, 'points': points, 'timings': timings}
+
+    from gurobipy import GRB, Model
+    clock = time.perf_counter()
+    model = Model("ProductionPlanningSweep", env=env)
+    model.setParam('OutputFlag', int(verbose))
+    v = add_to_gurobi(model, build_lp(p), 'plan')
+    model.update()
+    x, I = v[:n], v[n:]
+    constrs = model.getConstrs()
+    balance = constrs[:n]
+    timings['build'] = time.perf_counter() - clock
+
+    clock = time.perf_counter()
+    for value in values:
+        if cancel is not None and cancel.is_set():
+            break
+        q = with_parameter(p, parameter, value)
+        if parameter in ('demand_scale', 'init_inv'):
+            model.setAttr('RHS', balance, balance_rhs(q).tolist())
+        elif parameter == 'prod_cost':
+            x.Obj = np.repeat(q['prod_cost'], T)
+        elif parameter == 'inv_cost':
+            I.Obj = np.repeat(q['inv_cost'], T)
+        elif parameter == 'prod_cap':
+            x.UB = np.repeat(q['prod_cap'], T)
+        elif parameter == 'inv_cap':
+            I.UB = np.repeat(q['inv_cap'], T)
+        else:
+            r = [res['name'] for res in p['resources']].index(parameter.split(':', 1)[1])
+            model.setAttr('RHS', constrs[n + r * T:n + (r + 1) * T], [float(value)] * T)
+        # the basis of the previous point is kept, so this is a warm start
+        model.optimize()
+        ok = model.status == GRB.OPTIMAL
+        points.append({'value': value, 'status': STATUS_NAMES.get(model.status, str(model.status)),
+                       'objective': model.ObjVal if ok else None, 'runtime': model.Runtime,
+                       'iterations': int(model.IterCount)})
+        if progress is not None:
+            progress({'point': len(points), 'points': len(values), 'value': value, 'objective': points[-1]['objective']})
+    timings['solve'] = time.perf_counter() - clock
+    return {'parameter': parameter, 'points': points, 'timings': timings}
@@ -0,0 +1,267 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from gurobipy import GRB, Env, Model
+import scipy.sparse as sp
+from pp_solver import STATUS_NAMES, LinearProgram, RowBuilder, add_to_gurobi, parse_config
+from instance_io import load_pp
+
+_env = None
+
+
+def sample_demands(mean, std, n, seed=0):
+    # n demand scenarios drawn period by period from N(mean, std), cut at zero
+    rng = np.random.default_rng(seed)
+    mean = np.asarray(mean, dtype=float)
+    return np.maximum(0.0, rng.normal(mean, np.broadcast_to(std, mean.shape), size=(n, len(mean))))
+
+
+def stochastic_params(cfg):
+    # single-product instance plus the recourse costs: unmet demand is lost at
+    # shortage_cost per unit, stock above inv_cap is scrapped at disposal_cost
+    p = parse_config(cfg)
+    if p['multi']:
+        raise ValueError('The stochastic mode handles single-product configs only')
+    return {
+        'T': p['T'],
+        'mean': p['demands'][0],
+        'prod_cost': float(p['prod_cost'][0]),
+        'inv_cost': float(p['inv_cost'][0]),
+        'init_inv': float(p['init_inv'][0]),
+        'prod_cap': float(p['prod_cap'][0]),
+        'inv_cap': float(p['inv_cap'][0]),
+        'shortage_cost': float(cfg.get('shortage_cost', 10 * float(p['prod_cost'][0]))),
+        'disposal_cost': float(cfg.get('disposal_cost', 0.0)),
+    }
+
+
+def recourse_lp(s):
+    # second stage of one scenario, columns inv[t], short[t], scrap[t]:
+    #   inv[t] - inv[t-1] - short[t] + scrap[t] = prod[t] - d[t]   (inv[-1] = init_inv)
+    # the right-hand side is the only part that depends on the scenario and on
+    # the first-stage plan, so its duals are the subgradient w.r.t. production
+    T = s['T']
+    t = np.arange(T)
+    rows = RowBuilder(3 * T)
+    rows.add(np.concatenate([t, t[1:], t, t]), np.concatenate([t, t[:-1], T + t, 2 * T + t]),
+             np.concatenate([np.ones(T), -np.ones(T - 1), -np.ones(T), np.ones(T)]), '=', np.zeros(T))
+    A, sense, rhs = rows.build()
+    c = np.concatenate([np.full(T, s['inv_cost']), np.full(T, s['shortage_cost']), np.full(T, s['disposal_cost'])])
+    ub = np.concatenate([np.full(T, s['inv_cap']), np.full(2 * T, np.inf)])
+    return LinearProgram(c, A, sense, rhs, np.zeros(3 * T), ub, np.full(3 * T, GRB.CONTINUOUS))
+
+
+def recourse(args):
+    # Worker: recourse cost Q_s(x) and its subgradient for a chunk of scenarios.
+    # One model per call; scenarios only change the right-hand side, so each
+    # re-solve starts from the previous basis. With detail=True the inventory
+    # and shortage profiles are returned as well.
+    global _env
+    x, demands, s, detail = args
+    if _env is None:
+        _env = Env(empty=True)
+        _env.setParam('OutputFlag', 0)
+        _env.start()
+    model = Model(env=_env)
+    v = add_to_gurobi(model, recourse_lp(s), 'r')
+    model.update()
+    constrs = model.getConstrs()
+    T = s['T']
+    cost, grad = np.empty(len(demands)), np.empty((len(demands), T))
+    inv, short = (np.empty((len(demands), T)), np.empty((len(demands), T))) if detail else (None, None)
+    for i, d in enumerate(demands):
+        rhs = x - d
+        rhs[0] += s['init_inv']
+        model.setAttr('RHS', constrs, rhs.tolist())
+        model.optimize()
+        if model.status != GRB.OPTIMAL:
+            raise RuntimeError(f'Recourse problem {STATUS_NAMES.get(model.status, model.status)}')
+        cost[i] = model.ObjVal
+        grad[i] = model.getAttr('Pi', constrs)
+        if detail:
+            inv[i], short[i] = v.X[:T], v.X[T:2 * T]
+    model.dispose()
+    return cost, grad, inv, short
+
+
+def solve_stochastic(cfg, scenarios=None, n_scenarios=200, std=None, seed=0, workers=None, cuts='multi',
+                     tol=1e-4, max_iter=200, progress=None, cancel=None, verbose=False):
+    # Two-stage stochastic plan solved with the L-shaped method (Benders):
+    # production is decided before demand is known and shared by all
+    # scenarios; inventory, lost sales and scrap adapt per scenario. The master
+    # LP holds production plus one recourse estimate per scenario ('multi'
+    # cuts) or a single aggregated one ('single', a much smaller master). Each
+    # iteration evaluates every scenario in a process pool and adds the
+    # violated optimality cuts, until the master's lower bound meets the best
+    # plan's expected cost within `tol` (relative).
+    # Scenarios: an explicit (S, T) array, or n_scenarios sampled around the
+    # config's demands with `std` (absolute, scalar or per period; defaults to
+    # cfg['demand_std'], else cfg['demand_cv'] times the mean, else 20%).
+    if cuts not in ('multi', 'single'):
+        raise ValueError(f"Unknown cut type: {cuts}")
+    timings = {}
+    clock = time.perf_counter()
+    s = stochastic_params(cfg)
+    T = s['T']
+    if scenarios is None:
+        if std is None:
+            std = cfg.get('demand_std', np.asarray(cfg.get('demand_cv', 0.2)) * s['mean'])
+        scenarios = sample_demands(s['mean'], std, n_scenarios, seed)
+    scenarios = np.asarray(scenarios, dtype=float).reshape(-1, T)
+    S = len(scenarios)
+    prob = np.full(S, 1.0 / S)
+    workers = workers or os.cpu_count() or 1
+    chunks = np.array_split(np.arange(S), min(S, workers * 4))
+    timings['parse'] = time.perf_counter() - clock
+
+    # master: columns prod[0..T-1] then theta[0..K-1]; recourse costs are >= 0
+    K = S if cuts == 'multi' else 1
+    master = Model("StochasticMaster")
+    master.setParam('OutputFlag', int(verbose))
+    c = np.concatenate([np.full(T, s['prod_cost']), prob if cuts == 'multi' else [1.0]])
+    ub = np.concatenate([np.full(T, s['prod_cap']), np.full(K, np.inf)])
+    v = master.addMVar(T + K, lb=0.0, ub=ub, obj=c, name='m')
+
+    def evaluate(pool, x, detail=False):
+        jobs = [(x, scenarios[idx], s, detail) for idx in chunks]
+        parts = list(pool.map(recourse, jobs)) if pool else [recourse(job) for job in jobs]
+        return [np.concatenate([part[i] for part in parts]) if parts[0][i] is not None else None
+                for i in range(4)]
+
+    best = (np.inf, None)
+    lower = -np.inf
+    status, iterations = 'iteration_limit', 0
+    timings['master'] = timings['subproblems'] = 0.0
+    pool = None
+    if workers > 1:
+        # spawn, not fork: the master model (and maybe the GUI's solver
+        # thread) already live in this process
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        for iterations in range(1, max_iter + 1):
+            if cancel is not None and cancel.is_set():
+                status = 'interrupted'
+                break
+            clock = time.perf_counter()
+            master.optimize()
+            timings['master'] += time.perf_counter() - clock
+            if master.status != GRB.OPTIMAL:
+                status = STATUS_NAMES.get(master.status, str(master.status))
+                break
+            lower = master.ObjVal
+            x, theta = v.X[:T], v.X[T:]
+
+            clock = time.perf_counter()
+            cost, grad, _, _ = evaluate(pool, x)
+            timings['subproblems'] += time.perf_counter() - clock
+            upper = float(s['prod_cost'] * x.sum() + prob @ cost)
+            if upper < best[0]:
+                best = (upper, x)
+            gap = (best[0] - lower) / max(1.0, abs(best[0]))
+            if progress is not None:
+                progress({'iteration': iterations, 'lower': lower, 'upper': best[0], 'gap': gap})
+            if gap <= tol:
+                status = 'optimal'
+                break
+
+            # optimality cuts theta >= Q(x^) + g . (x - x^), written as
+            # theta - g . x >= Q(x^) - g . x^
+            if cuts == 'multi':
+                cut = np.flatnonzero(theta < cost - tol * np.maximum(1.0, np.abs(cost)))
+                if not len(cut):
+                    # every estimate is already exact up to the tolerance
+                    status = 'optimal'
+                    break
+                g, rhs = grad[cut], cost[cut] - grad[cut] @ x
+                cols = np.concatenate([np.tile(np.arange(T), len(cut)), T + cut])
+            else:
+                cut = np.arange(1)
+                g = (prob @ grad)[None, :]
+                rhs = np.array([prob @ cost - g[0] @ x])
+                cols = np.concatenate([np.arange(T), [T]])
+            rows = np.concatenate([np.repeat(np.arange(len(cut)), T), np.arange(len(cut))])
+            vals = np.concatenate([-g.ravel(), np.ones(len(cut))])
+            A = RowBuilder(T + K)
+            A.add(rows, cols, vals, '>', rhs)
+            A, sense, rhs = A.build()
+            master.addMConstr(A, v, sense, rhs)
+
+        result = {'status': status, 'objective': None, 'lower_bound': lower, 'gap': None,
+                  'iterations': iterations, 'scenarios': S, 'production': None, 'timings': timings}
+        if best[1] is not None:
+            clock = time.perf_counter()
+            cost, _, inv, short = evaluate(pool, best[1], detail=True)
+            timings['extract'] = time.perf_counter() - clock
+            demand = scenarios.sum()
+            result.update({
+                'objective': best[0],
+                'gap': (best[0] - lower) / max(1.0, abs(best[0])),
+                'production': best[1].tolist(),
+                'expected_inventory': (prob @ inv).tolist(),
+                'expected_shortage': (prob @ short).tolist(),
+                'fill_rate': 1.0 - short.sum() / demand if demand > 0 else 1.0,
+                'recourse_cost': {'mean': float(prob @ cost), 'p95': float(np.percentile(cost, 95))},
+            })
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    result['runtime'] = sum(timings.values())
+    return result
+
+
+def extensive_form(cfg, scenarios, verbose=False):
+    # The same two-stage model as one LP (production + every scenario's
+    # recourse). Only practical for small scenario counts; used to check the
+    # decomposition.
+    s = stochastic_params(cfg)
+    T = s['T']
+    scenarios = np.asarray(scenarios, dtype=float).reshape(-1, T)
+    S = len(scenarios)
+    sub = recourse_lp(s)
+    # every scenario's recourse block, with production moved to the left-hand side
+    A = sp.hstack([sp.kron(np.ones((S, 1)), -sp.identity(T)), sp.kron(sp.identity(S), sub.A)], format='csr')
+    rhs = -scenarios.copy()
+    rhs[:, 0] += s['init_inv']
+    lp = LinearProgram(
+        np.concatenate([np.full(T, s['prod_cost'])] + [sub.c / S] * S), A, np.full(S * T, '='), rhs.ravel(),
+        np.zeros(T + 3 * T * S), np.concatenate([np.full(T, s['prod_cap'])] + [sub.ub] * S),
+        np.full(T + 3 * T * S, GRB.CONTINUOUS),
+    )
+    model = Model("StochasticExtensive")
+    model.setParam('OutputFlag', int(verbose))
+    v = add_to_gurobi(model, lp, 'e')
+    model.optimize()
+    if model.status != GRB.OPTIMAL:
+        return {'status': STATUS_NAMES.get(model.status, str(model.status)), 'objective': None, 'production': None}
+    return {'status': 'optimal', 'objective': model.ObjVal, 'production': v.X[:T].tolist()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Two-stage stochastic production planning (Benders decomposition).')
+    parser.add_argument('config', help='production planning JSON config; its demands are the scenario means')
+    parser.add_argument('-n', '--scenarios', type=int, default=200)
+    parser.add_argument('--cv', type=float, help='demand coefficient of variation (overrides the config)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-w', '--workers', type=int, default=0, help='subproblem processes (0 = all CPUs)')
+    parser.add_argument('--cuts', choices=['multi', 'single'], default='multi')
+    parser.add_argument('--tol', type=float, default=1e-4)
+    args = parser.parse_args(argv)
+
+    cfg = load_pp(args.config)
+    if args.cv is not None:
+        cfg['demand_cv'] = args.cv
+        cfg.pop('demand_std', None)
+    result = solve_stochastic(cfg, n_scenarios=args.scenarios, seed=args.seed, workers=args.workers or None,
+                              cuts=args.cuts, tol=args.tol,
+                              progress=lambda info: print(f"iteration {info['iteration']}: "
+                                                          f"bounds [{info['lower']:.2f}, {info['upper']:.2f}] "
+                                                          f"gap {info['gap']:.2e}"))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
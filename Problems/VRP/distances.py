@@ -0,0 +1,60 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from scipy.spatial.distance import cdist
+
+CACHE_SIZE = 16
+_cache = OrderedDict()
+
+
+def coords_key(coords):
+    arr = np.ascontiguousarray(coords, dtype=float)
+    return hashlib.sha1(str(arr.shape).encode() + arr.tobytes()).hexdigest()
+
+
+def distance_matrix(coords):
+    # Euclidean matrix in one vectorized pass, memoized on the coordinates so
+    # repeated solves of the same locations skip the O(n²) work
+    arr = np.asarray(coords, dtype=float).reshape(-1, 2)
+    key = coords_key(arr)
+    dist = _cache.get(key)
+    if dist is not None:
+        _cache.move_to_end(key)
+        return dist
+    dist = cdist(arr, arr)
+    # shared between callers: make accidental in-place edits fail loudly
+    dist.setflags(write=False)
+    _cache[key] = dist
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return dist
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def nearest_neighbours(dist, k):
+    # indices of the k closest other nodes of each node, nearest first
+    n = len(dist)
+    k = max(1, min(k, n - 1))
+    d = np.array(dist, dtype=float)
+    np.fill_diagonal(d, np.inf)
+    idx = np.argpartition(d, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(d, idx, axis=1), axis=1)
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def candidate_arcs(dist, k, forbidden=()):
+    # sparse candidate graph: i-j is kept if either end is among the other's
+    # k nearest neighbours; depot arcs are always kept so every stop stays reachable
+    n = len(dist)
+    mask = np.zeros((n, n), dtype=bool)
+    nn = nearest_neighbours(dist, k)
+    mask[np.repeat(np.arange(n), nn.shape[1]), nn.ravel()] = True
+    mask |= mask.T
+    mask[0, :] = mask[:, 0] = True
+    np.fill_diagonal(mask, False)
+    for a, b in forbidden:
+        mask[a, b] = False
+    return mask
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial import cKDTree
+
+# Driving distances over a road graph instead of straight lines.
+# A road network file is one of
+#   .csv      one edge per row: x1,y1,x2,y2[,length][,oneway] with a header;
+#             nodes are the distinct end points, length defaults to the
+#             straight segment and oneway (0/1) to two-way
+#   .npz      arrays nodes (N, 2), edges (E, 2) node indices, optional
+#             length (E,) and oneway (E,)
+#   .geojson  LineString / MultiLineString features, e.g. exported from
+#             OpenStreetMap; properties "length" (whole line) and "oneway"
+#             ("yes"/true) are honoured
+# in the same units and coordinate system as the stops. Each stop is snapped
+# to its nearest graph node and the access legs are added to the path length.
+# Shortest paths come from SciPy's Dijkstra, a batch of source nodes per call,
+# spread over worker processes; matrices are cached on disk by graph and stops.
+
+CACHE_DIR = Path.home() / '.ro_gl3' / 'road_distances'
+# distances held per Dijkstra call (sources x graph nodes), ~160 MB of float64
+BATCH_CELLS = 20_000_000
+# below this many sources a pool costs more than it saves
+PARALLEL_MIN_SOURCES = 64
+GRAPHS = 4
+_graphs = OrderedDict()
+
+
+class RoadNetwork:
+
+    def __init__(self, nodes, u, v, length, oneway=None, key=None):
+        self.nodes = np.asarray(nodes, dtype=float).reshape(-1, 2)
+        n = len(self.nodes)
+        u, v = np.asarray(u, dtype=np.int64), np.asarray(v, dtype=np.int64)
+        length = np.asarray(length, dtype=float)
+        if len(u) == 0:
+            raise ValueError('Road network has no edges')
+        if u.min() < 0 or v.min() < 0 or max(u.max(), v.max()) >= n:
+            raise ValueError('Road network edge refers to a missing node')
+        if (length < 0).any() or not np.isfinite(length).all():
+            raise ValueError('Road network edge lengths must be finite and non-negative')
+        two_way = np.ones(len(u), dtype=bool) if oneway is None else ~np.asarray(oneway, dtype=bool)
+        rows = np.concatenate([u, v[two_way]])
+        cols = np.concatenate([v, u[two_way]])
+        data = np.concatenate([length, length[two_way]])
+        # parallel edges: the shortest one counts (a plain COO sum would add them)
+        order = np.lexsort((data, cols, rows))
+        rows, cols, data = rows[order], cols[order], data[order]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        # zero-length edges would vanish from a sparse matrix: keep them tiny instead
+        weight = np.maximum(data[first], 1e-12)
+        self.graph = sp.csr_matrix((weight, (rows[first], cols[first])), shape=(n, n))
+        self.tree = cKDTree(self.nodes)
+        self.key = key or hashlib.sha1(self.nodes.tobytes() + self.graph.data.tobytes()
+                                       + self.graph.indices.tobytes()).hexdigest()
+
+    def snap(self, coords):
+        # nearest node of each stop and the straight access distance to it
+        access, node = self.tree.query(np.asarray(coords, dtype=float).reshape(-1, 2))
+        return node, access
+
+
+def _csv(path):
+    with open(path, encoding='utf-8-sig') as f:
+        header = [h.strip().lower() for h in f.readline().split(',')]
+    need = ['x1', 'y1', 'x2', 'y2']
+    if any(h not in header for h in need):
+        raise ValueError(f'{Path(path).name}: header needs x1,y1,x2,y2 columns')
+    table = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2, encoding='utf-8-sig')
+    ends = table[:, [header.index(h) for h in need]]
+    length = table[:, header.index('length')] if 'length' in header else None
+    oneway = table[:, header.index('oneway')] != 0 if 'oneway' in header else None
+    return ends, length, oneway
+
+
+def _geojson(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    ends, length, oneway = [], [], []
+    for feature in data.get('features', []):
+        geom = feature.get('geometry') or {}
+        props = feature.get('properties') or {}
+        if geom.get('type') == 'LineString':
+            lines = [geom['coordinates']]
+        elif geom.get('type') == 'MultiLineString':
+            lines = geom['coordinates']
+        else:
+            continue
+        one = str(props.get('oneway', '')).lower() in ('yes', 'true', '1')
+        for line in lines:
+            pts = np.asarray(line, dtype=float)[:, :2]
+            if len(pts) < 2:
+                continue
+            seg = np.hstack([pts[:-1], pts[1:]])
+            straight = np.hypot(*(seg[:, 2:] - seg[:, :2]).T)
+            if props.get('length') is not None and straight.sum() > 0:
+                # spread the line's real length over its segments
+                straight = straight * float(props['length']) / straight.sum()
+            ends.append(seg)
+            length.append(straight)
+            oneway.append(np.full(len(seg), one))
+    if not ends:
+        raise ValueError(f'{Path(path).name}: no LineString features')
+    return np.vstack(ends), np.concatenate(length), np.concatenate(oneway)
+
+
+def load_network(path):
+    # parsed once per process and file version
+    path = Path(path)
+    stat = path.stat()
+    memo = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    net = _graphs.get(memo)
+    if net is not None:
+        _graphs.move_to_end(memo)
+        return net
+    suffix = path.suffix.lower()
+    if suffix == '.npz':
+        with np.load(path) as data:
+            edges = data['edges']
+            net = RoadNetwork(data['nodes'], edges[:, 0], edges[:, 1],
+                              data['length'] if 'length' in data else
+                              np.hypot(*(data['nodes'][edges[:, 1]] - data['nodes'][edges[:, 0]]).T),
+                              data['oneway'] if 'oneway' in data else None)
+    elif suffix in ('.csv', '.geojson', '.json'):
+        ends, length, oneway = _csv(path) if suffix == '.csv' else _geojson(path)
+        # nodes: distinct end points
+        nodes, idx = np.unique(ends.reshape(-1, 2), axis=0, return_inverse=True)
+        idx = idx.reshape(-1, 2)
+        if length is None:
+            length = np.hypot(*(ends[:, 2:] - ends[:, :2]).T)
+        net = RoadNetwork(nodes, idx[:, 0], idx[:, 1], length, oneway)
+    else:
+        raise ValueError(f'Unsupported road network format: {path.suffix} (use .csv, .npz or .geojson)')
+    _graphs[memo] = net
+    if len(_graphs) > GRAPHS:
+        _graphs.popitem(last=False)
+    return net
+
+
+# worker processes receive the graph once, through the pool initializer
+_worker_graph = None
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _rows(args):
+    sources, targets = args
+    return dijkstra(_worker_graph, directed=True, indices=sources)[:, targets]
+
+
+def node_distances(net, sources, targets, workers=0):
+    # shortest path lengths sources x targets (graph node indices)
+    batch = max(1, min(len(sources), BATCH_CELLS // max(1, net.graph.shape[0])))
+    jobs = [(sources[i:i + batch], targets) for i in range(0, len(sources), batch)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers == 1 or len(sources) < PARALLEL_MIN_SOURCES:
+        _init_worker(net.graph)
+        return np.vstack([_rows(job) for job in jobs])
+    # spawn: safe from the GUI's solver thread, as for the decomposition pool
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(net.graph,)) as pool:
+        return np.vstack(list(pool.map(_rows, jobs)))
+
+
+def road_distance_matrix(path, coords, workers=0, cache_dir=CACHE_DIR):
+    # n x n driving distances between the stops (asymmetric with one-way
+    # streets); raises ValueError if some stop cannot reach another
+    net = load_network(path)
+    coords = np.ascontiguousarray(coords, dtype=float).reshape(-1, 2)
+    key = hashlib.sha1(net.key.encode() + coords.tobytes()).hexdigest()
+    cached = Path(cache_dir) / f'{key}.npy' if cache_dir else None
+    if cached is not None and cached.exists():
+        dist = np.load(cached)
+    else:
+        node, access = net.snap(coords)
+        # each distinct node once: stops often share their nearest node
+        unique, inverse = np.unique(node, return_inverse=True)
+        between = node_distances(net, unique, unique, workers)[np.ix_(inverse, inverse)]
+        dist = access[:, None] + between + access[None, :]
+        np.fill_diagonal(dist, 0)
+        if cached is not None:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_suffix(f'.{os.getpid()}.tmp.npy')
+            np.save(tmp, dist)
+            os.replace(tmp, cached)
+    bad = np.argwhere(~np.isfinite(dist))
+    if len(bad):
+        i, j = bad[0]
+        raise ValueError(f'No road route from location {i + 1} to location {j + 1}')
+    dist.setflags(write=False)
+    return dist
@@ -1,24 +1,50 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, filedialog
-from gurobipy import GRB, Model, quicksum
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-from scipy.spatial.distance import euclidean
 import json
+import queue
+import sys
+import threading
+import time
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from paged_table import PagedTable
+from solution_cache import SolutionCache
+from startup import first_frame, lazy, prewarm, profile_startup
+from telemetry import emit
+
+# solver and plotting modules load on first use, or in the background once
+# the window is up, instead of before it appears
+plotting = lazy('plotting')
+vrp_solver = lazy('vrp_solver')
+vrp_incremental = lazy('vrp_incremental')
+instance_io = lazy('instance_io')
+PREWARM = ('plotting', 'vrp_solver', 'vrp_incremental')
+
 # Dark mode with green accent
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("green")
 
+METHODS = {'Exact (Gurobi)': 'mip', 'Exact, re-solve on edits (Gurobi)': 'incremental',
+           'Quick plan (savings)': 'savings', 'Local search': 'local_search', 'Cluster-first (parallel)': 'decompose'}
+FORMULATIONS = {'MTZ': 'mtz', 'Lazy subtour cuts': 'lazy', 'Two-index (identical fleet)': 'two_index'}
+INSTANCE_FILES = [('Instances', '*.json *.csv *.npz *.npy'), ('JSON files', '*.json'), ('CSV files', '*.csv'),
+                  ('NumPy arrays', '*.npz *.npy')]
+ROAD_FILES = [('Road networks', '*.csv *.npz *.geojson'), ('All files', '*.*')]
+# larger instances are shown in a paged table instead of one entry row per location
+MAX_ROWS = 20
+
 class ModernVRPApp:
-    def __init__(self, root):
+    # root: a window of its own, or a frame of the dashboard; worker: a shared
+    # solver_worker.SolverWorker (solves then run on its warm Gurobi Env)
+    def __init__(self, root, worker=None):
         self.root = root
-        self.root.title("VRP Route Optimizer")
-        self.root.geometry("800x800")
-        self.root.configure(bg="#23272f")
+        self.worker = worker
+        if isinstance(root, (tk.Tk, tk.Toplevel)):
+            self.root.title("VRP Route Optimizer")
+            self.root.geometry("800x800")
+            self.root.configure(bg="#23272f")
 
         # Header
         header = ctk.CTkFrame(self.root, fg_color="#181c22")
@@ -46,6 +72,11 @@ class ModernVRPApp:
         self.loc_menu = ctk.CTkOptionMenu(self.cities_frame, values=[str(i) for i in range(3, 21)], variable=self.num_locations, command=self.update_inputs)
         self.loc_menu.pack(side=tk.LEFT, padx=10)
 
+        # Solution method
+        ctk.CTkLabel(self.cities_frame, text="Method:").pack(side=tk.LEFT, padx=10)
+        self.method_var = tk.StringVar(value='Exact (Gurobi)')
+        ctk.CTkOptionMenu(self.cities_frame, values=list(METHODS), variable=self.method_var).pack(side=tk.LEFT, padx=10)
+
         # Inputs
         self.input_frame = ctk.CTkFrame(self.main_container)
         self.input_frame.pack(fill=tk.X, pady=10)
@@ -58,6 +89,11 @@ class ModernVRPApp:
         self.veh_menu = ctk.CTkOptionMenu(self.vehicle_frame, values=[str(i) for i in range(1, 11)], variable=self.num_vehicles)
         self.veh_menu.pack(side=tk.LEFT, padx=10)
 
+        # Formulation choice
+        ctk.CTkLabel(self.vehicle_frame, text="Formulation:").pack(side=tk.LEFT, padx=10)
+        self.formulation_var = tk.StringVar(value='MTZ')
+        ctk.CTkOptionMenu(self.vehicle_frame, values=list(FORMULATIONS), variable=self.formulation_var).pack(side=tk.LEFT, padx=10)
+
         # Constraint inputs
         self.max_dist_var = tk.DoubleVar(value=0)
         self.restrict_var = tk.StringVar(value="")
@@ -73,16 +109,53 @@ class ModernVRPApp:
         btn_frame.pack(pady=10)
         ctk.CTkButton(btn_frame, text="Load Config", command=self.load_config, width=140).pack(side=tk.LEFT, padx=10)
         ctk.CTkButton(btn_frame, text="Save Config", command=self.save_config, width=140).pack(side=tk.LEFT, padx=10)
+        ctk.CTkButton(btn_frame, text="Road Network", command=self.choose_road_network, width=140).pack(side=tk.LEFT, padx=10)
+        # road graph for driving distances (None: straight lines)
+        self.road_network = None
+        self.road_label = ctk.CTkLabel(self.main_container, text="Distances: straight line")
+        self.road_label.pack(pady=(0, 5))
+
+        self.use_cache_var = tk.BooleanVar(value=True)
+        ctk.CTkCheckBox(self.main_container, text="Reuse cached solutions", variable=self.use_cache_var).pack(pady=5)
 
         self.solve_btn = ctk.CTkButton(self.main_container, text="Solve VRP", command=self.solve_vrp, width=200, font=ctk.CTkFont(size=16, weight="bold"))
-        self.solve_btn.pack(pady=20)
+        self.solve_btn.pack(pady=(20, 5))
+
+        # Live progress of the background solve
+        progress_frame = ctk.CTkFrame(self.main_container)
+        progress_frame.pack(fill=tk.X, pady=5)
+        self.progress_bar = ctk.CTkProgressBar(progress_frame)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(fill=tk.X, padx=10, pady=5)
+        self.progress_label = ctk.CTkLabel(progress_frame, text="")
+        self.progress_label.pack(side=tk.LEFT, padx=10)
+        self.cancel_btn = ctk.CTkButton(progress_frame, text="Cancel", command=self.cancel_solve, width=100, state='disabled')
+        self.cancel_btn.pack(side=tk.RIGHT, padx=10, pady=5)
+        self.solver_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.cache = SolutionCache()
+        # two-index model kept alive between solves of the 'incremental'
+        # method: adding or removing a location re-solves from the previous
+        # routes instead of from scratch
+        self.session = None
+        # result windows, reused by every solve until the user closes them
+        self.result_win = self.graph_win = None
+        # coordinates of the instance being solved and the last incumbent not yet drawn
+        self.live_coords = self.live_routes = None
+        self.live_drawn = False
 
         # dynamic input trackers
         self.coord_inputs = []
         self.name_inputs = []
+        # instance loaded from file, too large for entry rows (solved as loaded)
+        self.bulk_cfg = None
         self.update_inputs()
+        prewarm(self.root, *PREWARM)
 
     def update_inputs(self, _=None):
+        # keep what was typed in the rows that remain
+        typed = [(nm.get(), x.get(), y.get()) for nm, (x, y) in zip(self.name_inputs, self.coord_inputs)]
+        self.bulk_cfg = None
         for w in self.input_frame.winfo_children(): w.destroy()
         self.coord_inputs.clear(); self.name_inputs.clear()
         for i in range(self.num_locations.get()):
@@ -93,17 +166,52 @@ class ModernVRPApp:
             x=ctk.CTkEntry(row, width=60); y=ctk.CTkEntry(row, width=60)
             x.pack(side=tk.LEFT, padx=2); y.pack(side=tk.LEFT, padx=2)
             self.coord_inputs.append((x,y))
+            if i < len(typed):
+                nm.insert(0, typed[i][0]); x.insert(0, typed[i][1]); y.insert(0, typed[i][2])
+
+    def show_bulk(self, cfg):
+        # paged, read-only view of a large instance
+        for w in self.input_frame.winfo_children(): w.destroy()
+        self.coord_inputs.clear(); self.name_inputs.clear()
+        self.bulk_cfg = cfg
+        if 'coords' in cfg:
+            coords, names = cfg['coords'], cfg.get('names')
+        else:
+            coords = [(loc.get('x', 0), loc.get('y', 0)) for loc in cfg['locations']]
+            names = [loc.get('name', '') for loc in cfg['locations']]
+        row = lambda i: (i + 1, names[i] if names else f'Loc{i+1}', float(coords[i][0]), float(coords[i][1]))
+        PagedTable(self.input_frame, ('#', 'Name', 'x', 'y'), len(coords), row).pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def choose_road_network(self):
+        # cancelling the dialog goes back to straight-line distances
+        fn = filedialog.askopenfilename(filetypes=ROAD_FILES)
+        self.set_road_network(fn or None)
+
+    def set_road_network(self, path):
+        self.road_network = path
+        self.road_label.configure(text=f"Distances: by road ({Path(path).name})" if path else "Distances: straight line")
+
+    def form_config(self, blank=''):
+        cfg = {'vehicles': self.num_vehicles.get(), 'max_dist': self.max_dist_var.get(), 'forbidden': self.restrict_var.get()}
+        cfg['road_network'] = self.road_network
+        if self.bulk_cfg is not None:
+            return dict(self.bulk_cfg, **cfg)
+        cfg['locations'] = []
+        for nm, (x, y) in zip(self.name_inputs, self.coord_inputs):
+            cfg['locations'].append({'name': nm.get(), 'x': float(x.get() or blank), 'y': float(y.get() or blank)})
+        return cfg
 
     def save_config(self):
-        cfg = {'locations': [], 'vehicles': self.num_vehicles.get(), 'max_dist': self.max_dist_var.get(), 'forbidden': self.restrict_var.get()}
-        for nm,(x,y) in zip(self.name_inputs, self.coord_inputs):
-            cfg['locations'].append({'name':nm.get(), 'x':float(x.get() or 0), 'y':float(y.get() or 0)})
-        fn = filedialog.asksaveasfilename(defaultextension='.json', filetypes=[('JSON files','*.json')])
+        cfg = self.form_config(blank=0)
+        fn = filedialog.asksaveasfilename(defaultextension='.json', filetypes=[('JSON files','*.json'), ('Compressed NumPy','*.npz')])
         if not fn:
             return
         try:
-            with open(fn, 'w', encoding='utf-8') as f:
-                json.dump(cfg, f, indent=4)
+            if fn.lower().endswith('.npz'):
+                instance_io.save_vrp_npz(fn, cfg)
+            else:
+                with open(fn, 'w', encoding='utf-8') as f:
+                    json.dump(cfg, f, indent=4, default=lambda a: a.tolist())
             messagebox.showinfo('Saved', 'Configuration saved successfully!')
         except Exception as e:
             messagebox.showerror('Error', f'Failed to save configuration:\n{e}')
@@ -111,33 +219,27 @@ class ModernVRPApp:
     def load_config(self):
         # Open in VRP examples directory
         examples_dir = Path(__file__).parent / 'VRPexemples'
-        fn = filedialog.askopenfilename(initialdir=str(examples_dir.resolve()), filetypes=[('JSON files','*.json')])
+        fn = filedialog.askopenfilename(initialdir=str(examples_dir.resolve()), filetypes=INSTANCE_FILES)
         if not fn:
             return
         try:
-            # Load raw bytes and detect encoding
-            raw = Path(fn).read_bytes()
-            # Check for UTF-16 BOM
-            if raw.startswith(b'\xff\xfe') or raw.startswith(b'\xfe\xff'):
-                content = raw.decode('utf-16')
-            else:
-                try:
-                    content = raw.decode('utf-8-sig')
-                except Exception:
-                    try:
-                        content = raw.decode('utf-8')
-                    except Exception:
-                        content = raw.decode('latin-1')
-            if not content.strip():
-                raise ValueError('Configuration file is empty')
-            cfg = json.loads(content)
+            # CSV and NumPy files take vehicles, length limit and forbidden routes from the form
+            cfg = instance_io.load_vrp(fn, vehicles=self.num_vehicles.get(), max_dist=self.max_dist_var.get(),
+                                       forbidden=self.restrict_var.get())
         except Exception as e:
-            messagebox.showerror('Error', f'Failed to parse JSON configuration:\n{e}')
+            messagebox.showerror('Error', f'Failed to load configuration:\n{e}')
             return
-        self.num_locations.set(len(cfg.get('locations',[])))
         self.num_vehicles.set(cfg.get('vehicles',1))
         self.max_dist_var.set(cfg.get('max_dist',0))
-        self.restrict_var.set(cfg.get('forbidden',''))
+        self.set_road_network(cfg.get('road_network'))
+        forbidden = cfg.get('forbidden','')
+        self.restrict_var.set(forbidden if isinstance(forbidden, str) else ','.join(f'{a}-{b}' for a, b in forbidden))
+        if 'coords' in cfg or len(cfg['locations']) > MAX_ROWS:
+            self.show_bulk(cfg)
+            messagebox.showinfo('Loaded', f"Loaded {len(cfg.get('coords', cfg.get('locations')))} locations.")
+            return
+        self.num_locations.set(len(cfg.get('locations',[])))
+        self.coord_inputs.clear(); self.name_inputs.clear()
         self.update_inputs()
         for i,loc in enumerate(cfg.get('locations',[])):
             if i<len(self.coord_inputs): self.name_inputs[i].insert(0,loc.get('name',''))
@@ -146,136 +248,143 @@ class ModernVRPApp:
 
     def solve_vrp(self):
         # collecter les coordonnées et noms
-        coords, names = [], []
-        for nm, (x, y) in zip(self.name_inputs, self.coord_inputs):
-            try:
-                coords.append((float(x.get()), float(y.get())))
-                names.append(nm.get() or f"Loc{len(coords)}")
-            except ValueError:
-                messagebox.showerror('Input Error', 'Coordinates must be numbers')
-                return
-        n, m = len(coords), self.num_vehicles.get()
-        # compute distances
-        dist = np.zeros((n, n))
-        for i in range(n):
-            for j in range(n):
-                dist[i, j] = euclidean(coords[i], coords[j]) if i != j else 0
-        # disable solve button
+        try:
+            cfg = self.form_config()
+        except ValueError:
+            messagebox.showerror('Input Error', 'Coordinates must be numbers')
+            return
+        method = METHODS[self.method_var.get()]
+        options = {
+            'method': method,
+            'formulation': FORMULATIONS[self.formulation_var.get()],
+            'time_limit': 10 if method in ('local_search', 'decompose') else 60,
+            'cache': self.cache if self.use_cache_var.get() else None,
+        }
+        # disable solve button, solve in a worker thread
         self.solve_btn.configure(state='disabled', text='Solving...')
-        self.root.update()
+        self.cancel_btn.configure(state='normal')
+        self.progress_bar.set(0)
+        self.progress_label.configure(text='Building model...')
+        self.cancel_event = threading.Event()
+        self.time_limit = options['time_limit']
+        self.start(self.solve_worker, cfg, options)
+        self.root.after(100, self.poll_solver)
+
+    def start(self, target, *args):
+        # on the shared solver thread when hosted by the dashboard
+        if self.worker is not None:
+            self.worker.submit(target, *args)
+        else:
+            threading.Thread(target=target, args=args, daemon=True).start()
+
+    def solve_worker(self, cfg, options, env=None):
+        progress = lambda info: self.solver_queue.put(('progress', info))
         try:
-            # construction du modèle Gurobi pour le VRP
-            model = Model('VRP')
-            model.setParam('TimeLimit', 60)  # limite de temps
-            model.setParam('MIPGap', 0.05)   # tolérance d'optimalité
-
-            # variable binaire x[i,j,k] = 1 si le véhicule k va de i à j
-            x = model.addVars(n, n, m, vtype=GRB.BINARY, name='x')
-            # variable continue t[i,k] pour l'ordre de visite (MTZ)
-            t = model.addVars(n, m, vtype=GRB.CONTINUOUS, name='t')
-
-            # objectif : minimiser la distance totale parcourue
-            model.setObjective(
-                quicksum(dist[i, j] * x[i, j, k]
-                         for i in range(n) for j in range(n) for k in range(m) if i != j),
-                GRB.MINIMIZE
-            )
-
-            # chaque client (j≠0) doit être visité exactement une fois par une des m voitures
-            for j in range(1, n):
-                model.addConstr(
-                    quicksum(x[i, j, k] for i in range(n) for k in range(m) if i != j) == 1,
-                    name=f"visit_once_{j}"
-                )
-
-            # chaque véhicule k part du dépôt (0) et y revient
-            for k in range(m):
-                model.addConstr(quicksum(x[0, j, k] for j in range(1, n)) == 1, name=f"depart_{k}")
-                model.addConstr(quicksum(x[i, 0, k] for i in range(1, n)) == 1, name=f"retour_{k}")
-
-            # élimination des sous-tours (MTZ) : si k va i->j, alors t[j,k] >= t[i,k] + 1
-            M = n  # grosse constante
-            for k in range(m):
-                model.addConstr(t[0, k] == 0, name=f"time_depot_{k}")
-                for i in range(n):
-                    for j in range(1, n):
-                        if i != j:
-                            model.addConstr(
-                                t[j, k] >= t[i, k] + 1 - M * (1 - x[i, j, k]),
-                                name=f"mtz_{i}_{j}_{k}"
-                            )
-
-            # conservation de flux : si une voiture arrive en j, elle doit aussi en repartir
-            for k in range(m):
-                for j in range(1, n):
-                    model.addConstr(
-                        quicksum(x[i, j, k] for i in range(n) if i != j) ==
-                        quicksum(x[j, i, k] for i in range(n) if i != j),
-                        name=f"flow_{j}_{k}"
-                    )
-
-            # contraintes utilisateurs : routes interdites
-            for route in self.restrict_var.get().split(','):
-                if '-' in route:
-                    try:
-                        a, b = map(int, route.split('-'))
-                        for k in range(m):
-                            model.addConstr(x[a-1, b-1, k] == 0)
-                            model.addConstr(x[b-1, a-1, k] == 0)
-                    except ValueError:
-                        pass
-            # contrainte de distance maximale par véhicule
-            md = self.max_dist_var.get()
-            if md > 0:
-                for k in range(m):
-                    model.addConstr(
-                        quicksum(dist[i, j] * x[i, j, k]
-                                 for i in range(n) for j in range(n) if i != j) <= md,
-                        name=f"maxdist_{k}"
-                    )
-
-            # résolution
-            model.optimize()
-            if model.status not in (GRB.OPTIMAL, GRB.TIME_LIMIT):
-                messagebox.showerror('Error', 'No feasible solution found')
+            self.solver_queue.put(('coords', vrp_solver.parse_config(cfg)[1]))
+            if options['method'] == 'incremental':
+                if self.session is None or not self.session.update(cfg):
+                    self.session = vrp_incremental.IncrementalVRP(cfg, time_limit=options['time_limit'], env=env)
+                result = self.session.solve(progress=progress, cancel=self.cancel_event, cache=options['cache'])
+            else:
+                result = vrp_solver.solve(cfg, progress=progress, cancel=self.cancel_event, env=env, **options)
+            self.solver_queue.put(('done', result))
+        except Exception as e:
+            self.solver_queue.put(('error', e))
+
+    def poll_solver(self):
+        try:
+            while True:
+                kind, payload = self.solver_queue.get_nowait()
+                if kind == 'progress':
+                    self.show_progress(payload)
+                    continue
+                if kind == 'coords':
+                    self.live_coords, self.live_routes, self.live_drawn = payload, None, False
+                    continue
+                self.solve_btn.configure(state='normal', text='Solve VRP')
+                self.cancel_btn.configure(state='disabled')
+                if kind == 'error':
+                    self.progress_label.configure(text='')
+                    messagebox.showerror('Error', str(payload))
+                else:
+                    self.finish_solve(payload)
                 return
-            sol = model.getAttr('x', x)
-            routes = []
-            for k in range(m):
-                path, cur = [0], 0
-                while True:
-                    nxt = next((j for j in range(n) if j != cur and sol[cur, j, k] > 0.5), None)
-                    if nxt is None or nxt == 0:
-                        path.append(0)
-                        break
-                    path.append(nxt)
-                    cur = nxt
-                if len(path) > 2:
-                    routes.append(path)
-            self.display_vrp_result(coords, routes, routes)
-            self.show_vrp_graph(coords, routes)
-        finally:
-            self.solve_btn.configure(state='normal', text='Solve VRP')
+        except queue.Empty:
+            pass
+        if self.live_routes is not None:
+            # only the newest incumbent of this poll is drawn
+            graph = self.route_figure()
+            if self.live_drawn and graph.coords is not None:
+                graph.routes(self.live_routes)
+            else:
+                graph.show(self.live_coords, self.live_routes)
+            self.live_routes, self.live_drawn = None, True
+        self.root.after(100, self.poll_solver)
+
+    def show_progress(self, info):
+        if 'backend' in info:
+            # HiGHS reports nothing until it is done and cannot be stopped
+            self.cancel_btn.configure(state='disabled')
+            self.progress_bar.set(0)
+            self.progress_label.configure(text=f'Solving with HiGHS (no live progress, up to {self.time_limit}s)...')
+            return
+        if 'clusters' in info:
+            self.progress_label.configure(text=f"Routed {info['clusters']}/{info['of']} clusters | {info['runtime']:.1f}s")
+            self.progress_bar.set(info['clusters'] / info['of'])
+            return
+        text = f"Incumbent: {info['objective']:.2f}"
+        if info.get('bound') is not None:
+            text += f" | Bound: {info['bound']:.2f}"
+        if info.get('gap') is not None:
+            text += f" | Gap: {100 * info['gap']:.1f}%"
+        text += f" | {info['runtime']:.1f}s"
+        self.progress_label.configure(text=text)
+        if info.get('routes') is not None and self.live_coords is not None:
+            self.live_routes = info['routes']
+        self.progress_bar.set(min(1.0, info['runtime'] / self.time_limit))
+
+    def cancel_solve(self):
+        self.cancel_event.set()
+        self.progress_label.configure(text='Cancelling...')
+
+    def finish_solve(self, result):
+        self.progress_bar.set(1)
+        self.progress_label.configure(text=f"Status: {result['status']}" + (" (cached)" if result.get('cached') else "")
+                                      + (" (HiGHS)" if result.get('backend') == 'highs' else ""))
+        record = result.get('telemetry')
+        if result['routes'] is None:
+            emit(record)
+            messagebox.showerror('Error', 'No feasible solution found')
+            return
+        self.live_routes = None
+        clock = time.perf_counter()
+        self.display_vrp_result(result['coords'], result['routes'], result['routes'])
+        self.route_figure().show(result['coords'], result['routes'])
+        # draw now, so the time below is the plotting's
+        self.root.update_idletasks()
+        if record is not None:
+            record['phases']['plotting'] = time.perf_counter() - clock
+        emit(record)
 
     def display_vrp_result(self, coords, routes, combined):
-        w=ctk.CTkToplevel(self.root); w.title('VRP Result'); w.geometry('400x300')
-        txt=ctk.CTkTextbox(w, width=380, height=280); txt.pack(padx=10,pady=10)
+        if self.result_win is None or not self.result_win.winfo_exists():
+            self.result_win=ctk.CTkToplevel(self.root); self.result_win.title('VRP Result'); self.result_win.geometry('400x300')
+            self.result_txt=ctk.CTkTextbox(self.result_win, width=380, height=280); self.result_txt.pack(padx=10,pady=10)
         text='Routes:\n'
         for i,r in enumerate(routes,1): text+=f'Vehicle {i}: '+'-'.join(str(x) for x in r)+'\n'
-        txt.insert('1.0', text)
-        txt.configure(state='disabled')
-
-    def show_vrp_graph(self, coords, routes):
-        w=ctk.CTkToplevel(self.root); w.title('VRP Graph'); w.geometry('600x600')
-        plt.style.use('dark_background')
-        fig,ax=plt.subplots(figsize=(6,6))
-        colors=plt.cm.tab10(np.linspace(0,1,len(routes)))
-        for c,r in zip(colors,routes):
-            pts=[coords[i] for i in r]
-            xs,ys=zip(*pts);
-            ax.plot(xs,ys,color=c,marker='o')
-        ax.set_facecolor('#2b2b2b'); ax.grid(True, color='gray', linestyle='--', alpha=0.5)
-        canvas=FigureCanvasTkAgg(fig, master=w); canvas.draw(); canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.result_txt.configure(state='normal')
+        self.result_txt.delete('1.0', tk.END)
+        self.result_txt.insert('1.0', text)
+        self.result_txt.configure(state='disabled')
+
+    def route_figure(self):
+        # one graph window and figure; each solve redraws it in place
+        if self.graph_win is None or not self.graph_win.winfo_exists():
+            self.graph_win=ctk.CTkToplevel(self.root); self.graph_win.title('VRP Graph'); self.graph_win.geometry('600x600')
+            self.graph=plotting.RouteFigure(self.graph_win)
+        return self.graph
 
 if __name__=='__main__':
-    root=ctk.CTk(); ModernVRPApp(root); root.mainloop()
+    if '--profile-startup' in sys.argv:
+        sys.exit(profile_startup(__file__))
+    root=ctk.CTk(); ModernVRPApp(root); first_frame(root); root.mainloop()
@@ -0,0 +1,119 @@
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from vrp_solver import solve_file
+from instance_io import FORMATS
+from solution_cache import SolutionCache
+from telemetry import TELEMETRY_ENV, emit
+
+
+def collect_instances(paths):
+    files = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            files.extend(sorted(f for f in p.iterdir() if f.suffix.lower() in FORMATS))
+        else:
+            files.append(p)
+    return files
+
+
+def run_one(path, options, cache_path=None):
+    try:
+        cache = SolutionCache(cache_path) if cache_path else None
+        return solve_file(path, cache=cache, **options)
+    except Exception as e:
+        return {'instance': Path(path).stem, 'status': 'error', 'error': str(e)}
+
+
+def write_json(results, fn):
+    with open(fn, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4)
+
+
+def write_csv(results, fn):
+    fields = ['instance', 'status', 'backend', 'objective', 'gap', 'runtime', 'vehicles_used', 'routes', 'error']
+    with open(fn, 'w', encoding='utf-8', newline='') as f:
+        w = csv.DictWriter(f, fieldnames=fields)
+        w.writeheader()
+        for r in results:
+            routes = r.get('routes') or []
+            w.writerow({
+                'instance': r.get('instance'),
+                'status': r.get('status'),
+                'backend': r.get('backend', ''),
+                'objective': r.get('objective'),
+                'gap': r.get('gap'),
+                'runtime': r.get('runtime'),
+                'vehicles_used': len(routes),
+                'routes': ' | '.join('-'.join(str(i) for i in route) for route in routes),
+                'error': r.get('error', ''),
+            })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve a batch of VRP configurations without the GUI.')
+    parser.add_argument('paths', nargs='+', help='instances (JSON, CSV, .npz, .npy) or directories of them')
+    parser.add_argument('-o', '--out', default='vrp_results', help='output path without extension')
+    parser.add_argument('-f', '--format', choices=['json', 'csv', 'both'], default='both')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--method', choices=['mip', 'savings', 'local_search', 'decompose'], default='mip')
+    parser.add_argument('--clustering', choices=['kmeans', 'sweep'], default='kmeans',
+                        help='how customers are split between vehicles with --method decompose')
+    parser.add_argument('--no-warm-start', dest='warm_start', action='store_false',
+                        help='do not seed Gurobi with the savings heuristic')
+    parser.add_argument('--neighbours', type=int, default=0,
+                        help='restrict arcs to the k nearest neighbours of each stop (0 = dense)')
+    parser.add_argument('--formulation', choices=['mtz', 'lazy', 'two_index'], default='mtz')
+    parser.add_argument('--backend', choices=['auto', 'gurobi', 'highs'],
+                        help='MIP solver (default: the config\'s "backend" key, else gurobi; auto: Gurobi '
+                             'when its licence takes the model size, HiGHS otherwise)')
+    parser.add_argument('--cache', help='SQLite solution cache to reuse and fill')
+    parser.add_argument('--time-limit', type=float, default=60)
+    parser.add_argument('--mip-gap', type=float, default=0.05)
+    parser.add_argument('--telemetry', default=os.environ.get(TELEMETRY_ENV),
+                        help='append per-solve telemetry to this file: JSON lines, or Prometheus text if it ends '
+                             'in .prom (default: $%s)' % TELEMETRY_ENV)
+    args = parser.parse_args(argv)
+
+    files = collect_instances(args.paths)
+    if not files:
+        parser.error('no instances found')
+    workers = max(1, min(args.workers, len(files)))
+    # split the cores between the worker processes
+    options = {
+        'method': args.method,
+        'formulation': args.formulation,
+        'backend': args.backend,
+        'warm_start': args.warm_start,
+        'neighbours': args.neighbours,
+        'time_limit': args.time_limit,
+        'mip_gap': args.mip_gap,
+        'threads': max(1, (os.cpu_count() or 1) // workers),
+        'clustering': args.clustering,
+        'workers': max(1, (os.cpu_count() or 1) // workers),
+        'verbose': False,
+    }
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_one, str(fn), options, args.cache) for fn in files]
+        for fut in as_completed(futures):
+            r = fut.result()
+            print(f"{r['instance']}: {r['status']} objective={r.get('objective')}")
+            results.append(r)
+            if args.telemetry and 'telemetry' in r:
+                r['telemetry']['labels']['instance'] = r['instance']
+                emit(r['telemetry'], args.telemetry)
+    results.sort(key=lambda r: r['instance'])
+
+    if args.format in ('json', 'both'):
+        write_json(results, f"{args.out}.json")
+    if args.format in ('csv', 'both'):
+        write_csv(results, f"{args.out}.csv")
+
+
+if __name__ == '__main__':
+    main()
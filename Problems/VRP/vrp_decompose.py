@@ -0,0 +1,70 @@
+import math
+import numpy as np
+from scipy.spatial.distance import cdist
+
+
+def sweep_clusters(coords, m):
+    # Sweep: order customers by polar angle around the depot, starting after
+    # the widest empty sector, and cut the circle into m runs of equal size.
+    # Returns m lists of customer indices (1-based node ids).
+    pts = np.asarray(coords, dtype=float)
+    n = len(pts) - 1
+    if n < m or m < 1:
+        return None
+    angle = np.arctan2(pts[1:, 1] - pts[0, 1], pts[1:, 0] - pts[0, 0])
+    order = np.argsort(angle, kind='stable')
+    gaps = np.diff(np.append(angle[order], angle[order[0]] + 2 * np.pi))
+    order = np.roll(order, -(int(np.argmax(gaps)) + 1))
+    return [(part + 1).tolist() for part in np.array_split(order, m)]
+
+
+def balanced_assignment(d, cap):
+    # each point goes to its nearest centre that still has room; points with
+    # the most to lose (largest regret) choose first
+    n, m = d.shape
+    ranked = np.argsort(d, axis=1)
+    regret = d[np.arange(n), ranked[:, 1]] - d[np.arange(n), ranked[:, 0]] if m > 1 else np.zeros(n)
+    load = np.zeros(m, dtype=int)
+    label = np.empty(n, dtype=int)
+    for i in np.argsort(-regret, kind='stable'):
+        for k in ranked[i]:
+            if load[k] < cap:
+                label[i] = k
+                load[k] += 1
+                break
+    # every vehicle serves at least one customer: empty clusters take the
+    # closest point from a cluster that can spare one
+    for k in np.flatnonzero(load == 0):
+        spare = load[label] > 1
+        i = int(np.flatnonzero(spare)[np.argmin(d[spare, k])])
+        load[label[i]] -= 1
+        label[i] = k
+        load[k] = 1
+    return label
+
+
+def kmeans_clusters(coords, m, seed=0, slack=0.2, iters=50):
+    # Capacity-aware k-means: Lloyd iterations whose assignment step caps every
+    # cluster at (1 + slack) times the average number of customers, so routes
+    # stay balanced. The route model has no demands, so capacity is a stop
+    # count. Returns m lists of customer indices (1-based node ids).
+    pts = np.asarray(coords, dtype=float)[1:]
+    n = len(pts)
+    if n < m or m < 1:
+        return None
+    rng = np.random.default_rng(seed)
+    cap = max(1, math.ceil(n / m * (1 + slack)))
+    # k-means++ seeding
+    centres = [pts[rng.integers(n)]]
+    for _ in range(1, m):
+        d2 = cdist(pts, np.array(centres), 'sqeuclidean').min(axis=1)
+        centres.append(pts[rng.choice(n, p=d2 / d2.sum())] if d2.sum() > 0 else pts[rng.integers(n)])
+    centres = np.array(centres)
+    label = None
+    for _ in range(iters):
+        new = balanced_assignment(cdist(pts, centres), cap)
+        if label is not None and (new == label).all():
+            break
+        label = new
+        centres = np.array([pts[label == k].mean(axis=0) for k in range(m)])
+    return [(np.flatnonzero(label == k) + 1).tolist() for k in range(m)]
@@ -0,0 +1,68 @@
+import numpy as np
+
+
+def clarke_wright(dist, m, forbidden=(), max_dist=0, candidates=None):
+    # Clarke-Wright savings: start with one route per customer and merge route
+    # ends by decreasing saving d[i,0] + d[0,j] - d[i,j] until m routes remain.
+    # `candidates` (boolean n x n) restricts the merges considered to a sparse graph.
+    # Returns a list of m routes [0, ..., 0] or None if no feasible plan was found.
+    dist = np.asarray(dist, dtype=float)
+    n = len(dist)
+    if n - 1 < m or m < 1:
+        return None
+    forbidden = set(forbidden)
+    symmetric = np.allclose(dist, dist.T)
+
+    allowed = np.ones((n, n), dtype=bool)
+    allowed[0, :] = allowed[:, 0] = False
+    np.fill_diagonal(allowed, False)
+    for a, b in forbidden:
+        allowed[a, b] = False
+    if candidates is not None:
+        allowed &= candidates
+    ii, jj = np.nonzero(allowed)
+    saving = dist[ii, 0] + dist[0, jj] - dist[ii, jj]
+    order = np.argsort(-saving, kind='stable')
+
+    routes = {i: [i] for i in range(1, n)}
+    length = {i: 2 * dist[0, i] if symmetric else dist[0, i] + dist[i, 0] for i in range(1, n)}
+    route_of = list(range(n))
+
+    for p in order:
+        if len(routes) == m:
+            break
+        i, j = int(ii[p]), int(jj[p])
+        a, b = route_of[i], route_of[j]
+        if a == b:
+            continue
+        ra, rb = routes[a], routes[b]
+        # i must end route a and j must start route b (reversing if allowed)
+        if ra[-1] != i:
+            if symmetric and ra[0] == i:
+                ra.reverse()
+            else:
+                continue
+        if rb[0] != j:
+            if symmetric and rb[-1] == j:
+                rb.reverse()
+            else:
+                continue
+        new_len = length[a] + length[b] - dist[i, 0] - dist[0, j] + dist[i, j]
+        if max_dist > 0 and new_len > max_dist + 1e-9:
+            continue
+        ra.extend(rb)
+        length[a] = new_len
+        for v in rb:
+            route_of[v] = a
+        del routes[b], length[b]
+
+    if len(routes) != m:
+        return None
+    plan = []
+    for r in routes.values():
+        if (0, r[0]) in forbidden or (r[-1], 0) in forbidden:
+            return None
+        if max_dist > 0 and length[route_of[r[0]]] > max_dist + 1e-9:
+            return None
+        plan.append([0] + r + [0])
+    return plan
@@ -0,0 +1,243 @@
+import time
+import numpy as np
+from gurobipy import GRB, Column, Model, quicksum, tupledict, tuplelist
+from distances import distance_matrix
+from vrp_heuristics import clarke_wright
+from vrp_local_search import LocalSearch
+from vrp_solver import (SHORTEST_TOUR_MAX, STATUS_NAMES, add_to_gurobi, admissible_arcs, cache_lookup, cache_store,
+                        instance_signature, make_result, monitor, parse_config, route_length, routes_feasible,
+                        routes_from_arcs, shortest_tour, subtours, two_index_program)
+from telemetry import Telemetry
+
+
+class IncrementalVRP:
+    # Keeps one two-index Gurobi model (identical fleet, lazy subtour and
+    # route-length cuts) alive between solves. add_stop / remove_stop only
+    # touch the variables and constraints of that stop, the cuts found so far
+    # stay in the model, and the last routes, with the stop cheaply inserted
+    # or spliced out, go in as the MIP start of the next solve.
+    # Node 0 is the depot; stops are numbered by position, so removing stop v
+    # renumbers the stops after it.
+
+    def __init__(self, cfg, time_limit=60, mip_gap=0.05, threads=0, verbose=False, env=None):
+        names, coords, m, md, forbidden = parse_config(cfg)
+        if len(coords) < 2:
+            raise ValueError('At least a depot and one customer are required')
+        if cfg.get('road_network'):
+            raise ValueError('Incremental re-optimization works with straight-line distances only')
+        if cfg.get('backend', 'gurobi') != 'gurobi':
+            raise ValueError('Incremental re-optimization needs Gurobi')
+        self.names, self.coords = list(names), [tuple(c) for c in coords]
+        self.m, self.md, self.forbidden = m, md, set(forbidden)
+        self.dist = np.array(distance_matrix(self.coords))
+        self.timings = {}
+
+        clock = time.perf_counter()
+        self.model = Model('VRP', env=env)
+        self.model.setParam('OutputFlag', int(verbose))
+        self.model.setParam('TimeLimit', time_limit)
+        self.model.setParam('MIPGap', mip_gap)
+        self.model.setParam('LazyConstraints', 1)
+        if threads:
+            self.model.setParam('Threads', threads)
+        arcs = admissible_arcs(self.dist, self.forbidden, md)
+        v = add_to_gurobi(self.model, two_index_program(self.dist, m, arcs), 'x')
+        self.model.update()
+        self.x = tupledict(zip(arcs, v.tolist()))
+        # degree rows in two_index_program order: customers in, customers out,
+        # depot out, depot in; into[j] / out[i] are indexed by node
+        rows = self.model.getConstrs()
+        n = len(self.coords)
+        self.into = [rows[2 * n - 1]] + rows[:n - 1]
+        self.out = [rows[2 * n - 2]] + rows[n - 1:2 * n - 2]
+        # kept cuts: (nodes involved, constraint)
+        self.cuts = []
+        self.routes = clarke_wright(self.dist, m, self.forbidden, md)
+        self.timings['build'] = time.perf_counter() - clock
+
+    def add_stop(self, name, x, y, forbidden=()):
+        # new stop at the end; `forbidden` lists existing nodes it must not be
+        # linked to (both directions). Returns its node number.
+        clock = time.perf_counter()
+        v = len(self.coords)
+        self.names.append(name or f"Loc{v + 1}")
+        self.coords.append((float(x), float(y)))
+        row = np.hypot(*(np.array(self.coords[:-1]) - self.coords[-1]).T)
+        dist = np.zeros((v + 1, v + 1))
+        dist[:v, :v] = self.dist
+        dist[v, :v] = dist[:v, v] = row
+        self.dist = dist
+        for u in forbidden:
+            self.forbidden.update({(u, v), (v, u)})
+
+        # only arcs touching v can be new; admissible_arcs applies the
+        # forbidden list and the depot -> i -> j -> depot length test
+        ok = np.zeros((v + 1, v + 1), dtype=bool)
+        ok[v, :] = ok[:, v] = True
+        new = admissible_arcs(self.dist, self.forbidden, self.md, ok)
+        for i, j in new:
+            # x[v,j] counts in j's in-degree, x[i,v] in i's out-degree
+            col = Column([1.0], [self.into[j]]) if i == v else Column([1.0], [self.out[i]])
+            self.x[i, j] = self.model.addVar(vtype=GRB.BINARY, obj=self.dist[i, j], column=col, name=f'x[{i},{j}]')
+        self.into.append(self.model.addConstr(quicksum(self.x[i, v] for i, _ in new.select('*', v)) == 1))
+        self.out.append(self.model.addConstr(quicksum(self.x[v, j] for _, j in new.select(v, '*')) == 1))
+
+        if self.routes is not None:
+            ls = LocalSearch(self.dist, self.m, self.forbidden, self.md)
+            routes = [list(r) for r in self.routes]
+            lengths = np.array([ls.route_len(r) for r in routes])
+            self.routes = routes if ls.cheapest_insertion(routes, lengths, [v]) else None
+        self.timings['edit'] = time.perf_counter() - clock
+        return v
+
+    def remove_stop(self, v):
+        # drops stop v (1 .. n-1) and renumbers the stops after it
+        n = len(self.coords)
+        if not 1 <= v < n:
+            raise ValueError(f'No stop {v}')
+        clock = time.perf_counter()
+        gone = [self.x[a] for a in list(self.x) if v in a]
+        gone += [self.into.pop(v), self.out.pop(v)]
+        gone += [c for nodes, c in self.cuts if v in nodes]
+        self.model.remove(gone)
+
+        def shift(i):
+            return i - (i > v)
+
+        self.x = tupledict(((shift(i), shift(j)), var) for (i, j), var in self.x.items() if v not in (i, j))
+        self.cuts = [({shift(i) for i in nodes}, c) for nodes, c in self.cuts if v not in nodes]
+        self.forbidden = {(shift(a), shift(b)) for a, b in self.forbidden if v not in (a, b)}
+        del self.names[v], self.coords[v]
+        self.dist = np.delete(np.delete(self.dist, v, 0), v, 1)
+        if self.routes is not None:
+            # splice v out; the start is partial if pred -> succ is not an arc
+            self.routes = [[shift(i) for i in r if i != v] for r in self.routes]
+            if any(len(r) < 3 for r in self.routes):
+                self.routes = None
+        self.timings['edit'] = time.perf_counter() - clock
+
+    def update(self, cfg):
+        # brings the model in line with an edited configuration by removing
+        # and appending stops (an edited stop is re-added with every stop after
+        # it); returns False, model untouched, if the depot, fleet, length
+        # limit or forbidden arcs between kept stops changed
+        names, coords, m, md, forbidden = parse_config(cfg)
+        if m != self.m or md != self.md or len(coords) < 2 or cfg.get('road_network'):
+            return False
+        new = list(zip(names, map(tuple, coords)))
+        old = list(zip(self.names, self.coords))
+        if new[0] != old[0]:
+            return False
+        # current stops matched in order against the start of the new list
+        kept, pos = [], 1
+        for i in range(1, len(old)):
+            if pos < len(new) and old[i] == new[pos]:
+                kept.append(i)
+                pos += 1
+        added = new[pos:]
+        if len(kept) + 1 + len(added) != len(new):
+            return False
+        # forbidden arcs as they will be numbered after the edit
+        order = [0] + kept + [None] * len(added)
+        expected = {(order.index(a), order.index(b)) for a, b in self.forbidden if a in order and b in order}
+        if not expected <= forbidden or any(a < len(kept) + 1 and b < len(kept) + 1 for a, b in forbidden - expected):
+            return False
+        for v in reversed(range(1, len(old))):
+            if v not in kept:
+                self.remove_stop(v)
+        for k, (name, (x, y)) in enumerate(added):
+            v = len(kept) + 1 + k
+            self.add_stop(name, x, y, [u for u in range(v) if (u, v) in forbidden])
+        return True
+
+    def callback(self, model, where):
+        if where != GRB.Callback.MIPSOL:
+            return
+        vals = model.cbGetSolution(self.x)
+        used = [a for a, v in vals.items() if v > 0.5]
+        arcs = self.arcs
+        found, too_long = [], 0
+        for S in subtours(len(self.coords), used):
+            inside = set(S)
+            expr = quicksum(self.x[i, j] for i in S for _, j in arcs.select(i, '*') if j in inside)
+            model.cbLazy(expr <= len(S) - 1)
+            found.append((inside, expr, len(S) - 1))
+        if self.md > 0:
+            for r in routes_from_arcs(used):
+                path = list(zip(r, r[1:]))
+                if sum(self.dist[i, j] for i, j in path) > self.md + 1e-6:
+                    S = r[1:-1]
+                    if len(S) <= SHORTEST_TOUR_MAX and shortest_tour(self.dist, S) > self.md + 1e-6:
+                        # no single route can serve all of S: it needs two vehicles
+                        inside = set(S)
+                        expr = quicksum(self.x[i, j] for i in S for _, j in arcs.select(i, '*') if j in inside)
+                        model.cbLazy(expr <= len(S) - 2)
+                        found.append((inside, expr, len(S) - 2))
+                    else:
+                        model.cbLazy(quicksum(self.x[a] for a in path) <= len(path) - 1)
+                        too_long += 1
+        self.pending.extend(found)
+        return len(found) + too_long
+
+    def solve(self, progress=None, cancel=None, cache=None):
+        # `cache` (a SolutionCache) is shared with vrp_solver.solve: the same
+        # instance solved to optimality, or by this session with the same
+        # limits, is returned as is; otherwise a better cached or neighbouring
+        # solution replaces the MIP start
+        tel = Telemetry('vrp', method='incremental', formulation='two_index', backend='gurobi')
+        size = {'locations': len(self.coords), 'vehicles': self.m}
+        if len(self.coords) - 1 < self.m:
+            result = make_result(self.names, self.coords, 'infeasible')
+            result['telemetry'] = tel.record(status='infeasible', objective=None, gap=None, size=size)
+            return result
+        if cache is not None:
+            sig = instance_signature(self.coords, self.m, self.md, self.forbidden)
+            options = {'method': 'incremental', 'time_limit': self.model.Params.TimeLimit,
+                       'mip_gap': self.model.Params.MIPGap}
+            key, family, hit, reuse, near = cache_lookup(cache, sig, options)
+            if reuse:
+                self.routes = [list(r) for r in hit['routes']]
+                result = make_result(self.names, self.coords, hit['status'], self.dist, self.routes,
+                                     objective=hit['objective'], gap=hit['gap'], runtime=0.0, cached=True,
+                                     timings=dict(self.timings))
+                result['telemetry'] = tel.record(status=hit['status'], objective=hit['objective'], gap=hit['gap'],
+                                                 cached=True, size=size)
+                return result
+            if near and routes_feasible(near['routes'], self.dist, self.m, self.forbidden, self.md):
+                known = None if self.routes is None else sum(route_length(self.dist, r) for r in self.routes)
+                if known is None or sum(route_length(self.dist, r) for r in near['routes']) < known:
+                    self.routes = [list(r) for r in near['routes']]
+        clock = time.perf_counter()
+        self.model.update()
+        arcs = list(self.x.values())
+        self.model.setAttr('Start', arcs, [GRB.UNDEFINED if self.routes is None else 0] * len(arcs))
+        if self.routes is not None:
+            for r in self.routes:
+                for a in zip(r, r[1:]):
+                    if a in self.x:
+                        self.x[a].Start = 1
+        self.arcs, self.pending = tuplelist(self.x.keys()), []
+        self.model.optimize(monitor(self.callback, progress, cancel, x=self.x, telemetry=tel))
+        tel.gurobi_search(self.model)
+        # subtour and two-vehicle cuts found by the callback become ordinary
+        # rows for the next solve (path cuts only forbid one path and are not
+        # worth keeping)
+        for nodes, expr, rhs in self.pending:
+            self.cuts.append((nodes, self.model.addConstr(expr <= rhs)))
+        self.timings['solve'] = time.perf_counter() - clock
+        status = STATUS_NAMES.get(self.model.status, str(self.model.status))
+        if self.model.SolCount == 0:
+            result = make_result(self.names, self.coords, status, runtime=self.model.Runtime,
+                                 timings=dict(self.timings))
+        else:
+            sol = self.model.getAttr('x', self.x)
+            self.routes = routes_from_arcs(a for a, val in sol.items() if val > 0.5)
+            result = make_result(self.names, self.coords, status, self.dist, self.routes, gap=self.model.MIPGap,
+                                 runtime=self.model.Runtime, timings=dict(self.timings))
+        # model size includes the cuts kept so far
+        tel.phases.update(self.timings)
+        tel.gurobi_model(self.model)
+        result['telemetry'] = tel.record(status=status, objective=result['objective'], gap=result['gap'], size=size)
+        if cache is not None:
+            cache_store(cache, key, family, hit, options, result)
+        return result
@@ -0,0 +1,322 @@
+import time
+from itertools import chain
+import numpy as np
+from vrp_heuristics import clarke_wright
+
+EPS = 1e-9
+
+
+class LocalSearch:
+    # Improvement engine over a dense distance matrix: Or-opt/relocate (segments
+    # of 1-3 stops), swap and intra-route 2-opt, evaluated with NumPy against all
+    # edges at once, inside a ruin-and-recreate (LNS) outer loop. Every vehicle
+    # keeps at least one customer, as in the MIP model. With a `candidates` mask
+    # (see distances.candidate_arcs) moves only bring stops next to neighbours.
+    # When no start within max_dist can be built, the search first runs on the
+    # length over max_dist, at a growing penalty, until the routes fit.
+
+    def __init__(self, dist, m, forbidden=(), max_dist=0, seed=0, candidates=None):
+        dist = np.asarray(dist, dtype=float)
+        self.n = len(dist)
+        self.m = m
+        self.dist = dist
+        # forbidden arcs get a prohibitive finite cost (inf would give nan deltas)
+        self.big = 1e6 * (dist.max() + 1)
+        self.C = dist.copy()
+        for a, b in forbidden:
+            self.C[a, b] = self.big
+        self.forbidden = set(forbidden)
+        self.symmetric = np.allclose(self.C, self.C.T)
+        self.md = max_dist if max_dist > 0 else np.inf
+        # penalty per unit of route length over `target` (0: max_dist is a hard limit)
+        self.weight, self.target = 0.0, np.inf
+        self.rng = np.random.default_rng(seed)
+        self.candidates = candidates
+        self._edges = self._edges_of = None
+        self._tril = {}
+
+    # -- helpers -----------------------------------------------------------
+    def route_len(self, r):
+        r = np.asarray(r)
+        return float(self.C[r[:-1], r[1:]].sum())
+
+    def cost(self, routes):
+        return sum(self.route_len(r) for r in routes)
+
+    def pen(self, lengths):
+        # route lengths plus the penalty on their excess (the lengths as they
+        # are while max_dist is a hard limit)
+        if not self.weight:
+            return lengths
+        return lengths + self.weight * np.maximum(0.0, lengths - self.target)
+
+    def feasible(self, routes, lengths):
+        return (all(len(r) > 2 for r in routes) and max(lengths) <= self.md + EPS
+                and max(lengths) < self.big)
+
+    def edges(self, routes):
+        # flattened (from, to, route) arrays, cached until the next move
+        if self._edges_of is not routes or self._edges is None:
+            sizes = np.array([len(r) for r in routes])
+            flat = np.fromiter(chain.from_iterable(routes), dtype=np.int64, count=sizes.sum())
+            tail = np.ones(len(flat), dtype=bool)
+            tail[np.cumsum(sizes) - 1] = False
+            pos = np.flatnonzero(tail)
+            self._edges = flat[pos], flat[pos + 1], np.repeat(np.arange(len(routes)), sizes - 1)
+            self._edges_of = routes
+        return self._edges
+
+    def lower(self, k):
+        # cached lower-triangle mask (q <= p + 1) for 2-opt
+        if k not in self._tril:
+            self._tril[k] = np.tril(np.ones((k, k), dtype=bool), 1)
+        return self._tril[k]
+
+    def insert_after(self, r, node, seg):
+        i = 0 if node == 0 else r.index(node)
+        r[i+1:i+1] = seg
+        self._edges = None
+
+    # -- construction ------------------------------------------------------
+    def cheapest_insertion(self, routes, lengths, nodes):
+        for u in nodes:
+            frm, to, rid = self.edges(routes)
+            ins = self.C[frm, u] + self.C[u, to] - self.C[frm, to]
+            ok = lengths[rid] + ins <= self.md + EPS
+            if not ok.any():
+                return False
+            delta = self.pen(lengths[rid] + ins) - self.pen(lengths[rid])
+            e = np.flatnonzero(ok)[np.argmin(delta[ok])]
+            if ins[e] >= self.big:
+                return False
+            self.insert_after(routes[rid[e]], int(frm[e]), [u])
+            lengths[rid[e]] += ins[e]
+        return True
+
+    def initial(self):
+        md = 0 if self.md == np.inf else self.md
+        routes = clarke_wright(self.dist, self.m, self.forbidden, md, self.candidates)
+        if routes is None and self.candidates is not None:
+            routes = clarke_wright(self.dist, self.m, self.forbidden, md)
+        if routes:
+            return routes
+        if self.n - 1 < self.m:
+            return None
+        # one route per farthest customer, then cheapest insertion of the rest
+        order = list(np.argsort(-self.C[0, 1:]) + 1)
+        routes = [[0, int(u), 0] for u in order[:self.m]]
+        lengths = np.array([self.route_len(r) for r in routes])
+        if not self.cheapest_insertion(routes, lengths, [int(u) for u in order[self.m:]]):
+            return None
+        return routes if self.feasible(routes, lengths) else None
+
+    # -- moves -------------------------------------------------------------
+    def or_opt(self, routes, lengths, u, L):
+        # move the segment of L stops starting at u elsewhere (possibly reversed)
+        a = next(k for k, r in enumerate(routes) if u in r)
+        r = routes[a]
+        i = r.index(u)
+        if i + L > len(r) - 1 or len(r) - 2 == L:
+            return False
+        seg = r[i:i+L]
+        p, nx = r[i-1], r[i+L]
+        gain = self.C[p, seg[0]] + self.C[seg[-1], nx] - self.C[p, nx]
+        inner = self.route_len(seg) if L > 1 else 0.0
+        frm, to, rid = self.edges(routes)
+        keep = rid != a
+        keep[rid == a] = ~np.isin(frm[rid == a], [p] + seg)
+        base = -self.C[frm, to]
+        ins = self.C[frm, seg[0]] + self.C[seg[-1], to] + base
+        rev = self.C[frm, seg[-1]] + self.C[seg[0], to] + base if self.symmetric and L > 1 else np.full(len(frm), np.inf)
+        best = np.minimum(ins, rev)
+        # the segment's own arcs move with it to the target route
+        new_len = lengths[rid] + best + np.where(rid == a, -gain, inner)
+        ok = keep & (new_len <= self.md + EPS)
+        if self.candidates is not None:
+            ok &= self.candidates[frm, seg[0]] | self.candidates[seg[-1], to]
+        if not ok.any():
+            return False
+        left = self.pen(lengths[a] - gain - inner) - self.pen(lengths[a])
+        delta = self.pen(new_len) - self.pen(lengths[rid]) + np.where(rid == a, 0.0, left)
+        e = np.flatnonzero(ok)[np.argmin(delta[ok])]
+        if delta[e] >= -EPS:
+            return False
+        b = rid[e]
+        if rev[e] < ins[e]:
+            seg = seg[::-1]
+        del r[i:i+L]
+        self._edges = None
+        lengths[a] -= gain + inner
+        self.insert_after(routes[b], int(frm[e]), seg)
+        lengths[b] += best[e] + inner
+        return True
+
+    def swap(self, routes, lengths, u):
+        a = next(k for k, r in enumerate(routes) if u in r)
+        r = routes[a]
+        i = r.index(u)
+        pu, su = r[i-1], r[i+1]
+        frm, to, rid = self.edges(routes)
+        # candidates v are the "to" ends of edges that are customers
+        cand = (to != 0) & (rid != a)
+        if not cand.any():
+            return False
+        idx = np.flatnonzero(cand)
+        v, pv, b = to[idx], frm[idx], rid[idx]
+        # next of v is the "to" of the following edge in the same route
+        sv = to[idx + 1]
+        C = self.C
+        da = C[pu, v] + C[v, su] - C[pu, u] - C[u, su]
+        db = C[pv, u] + C[u, sv] - C[pv, v] - C[v, sv]
+        ok = (lengths[a] + da <= self.md + EPS) & (lengths[b] + db <= self.md + EPS)
+        if self.candidates is not None:
+            ok &= self.candidates[u, v]
+        if not ok.any():
+            return False
+        delta = (self.pen(lengths[a] + da) - self.pen(lengths[a])
+                 + self.pen(lengths[b] + db) - self.pen(lengths[b]))
+        c = np.flatnonzero(ok)[np.argmin(delta[ok])]
+        if delta[c] >= -EPS:
+            return False
+        vb, bb = int(v[c]), int(b[c])
+        rb = routes[bb]
+        r[i], rb[rb.index(vb)] = vb, u
+        self._edges = None
+        lengths[a] += da[c]
+        lengths[bb] += db[c]
+        return True
+
+    def two_opt(self, routes, lengths, a):
+        r = np.asarray(routes[a])
+        if len(r) < 5 or not self.symmetric:
+            return False
+        A, B = r[:-1], r[1:]
+        old = self.C[A, B]
+        delta = self.C[A[:, None], A[None, :]] + self.C[B[:, None], B[None, :]] - old[:, None] - old[None, :]
+        delta[self.lower(len(A))] = np.inf
+        p, q = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[p, q] >= -EPS:
+            return False
+        routes[a][p+1:q+1] = routes[a][p+1:q+1][::-1]
+        self._edges = None
+        lengths[a] += delta[p, q]
+        return True
+
+    def descend(self, routes, lengths, deadline, nodes=None):
+        nodes = list(range(1, self.n)) if nodes is None else list(nodes)
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            watch = set(nodes)
+            for a in range(len(routes)):
+                if len(watch) < self.n - 1 and watch.isdisjoint(routes[a]):
+                    continue
+                while self.two_opt(routes, lengths, a):
+                    improved = True
+            self.rng.shuffle(nodes)
+            for u in nodes:
+                if time.perf_counter() >= deadline:
+                    break
+                for L in (1, 2, 3):
+                    if self.or_opt(routes, lengths, u, L):
+                        improved = True
+                if self.swap(routes, lengths, u):
+                    improved = True
+
+    # -- LNS ---------------------------------------------------------------
+    def ruin_recreate(self, routes):
+        customers = self.n - 1
+        k = int(self.rng.integers(min(2, customers), max(3, customers // 5) + 1))
+        if self.rng.random() < 0.5:
+            # related removal: a seed customer and its nearest neighbours
+            c = int(self.rng.integers(1, self.n))
+            near = np.argsort(self.dist[c, 1:])[:k] + 1
+            removed = [int(v) for v in near]
+        else:
+            removed = [int(v) for v in self.rng.choice(np.arange(1, self.n), size=min(k, customers), replace=False)]
+        gone = set(removed)
+        new = [[v for v in r if v not in gone] for r in routes]
+        lengths = np.array([self.route_len(r) for r in new])
+        self.rng.shuffle(removed)
+        if not self.cheapest_insertion(new, lengths, removed):
+            return None, None, removed
+        if not self.feasible(new, lengths):
+            return None, None, removed
+        return new, lengths, removed
+
+    def repair(self, deadline, cancel=None, rounds=100):
+        # routes within max_dist from a start that ignores it: ruin and
+        # recreate on length plus weight x excess, the weight doubling every
+        # `rounds` iterations without a better penalised cost; None if the
+        # excess is still there at the deadline
+        md = self.md
+        self.md, self.target, self.weight = np.inf, md, 1.0
+        try:
+            routes = self.initial()
+            if routes is None:
+                return None
+            lengths = np.array([self.route_len(r) for r in routes])
+            self.descend(routes, lengths, deadline)
+            cost, stall = float(self.pen(lengths).sum()), 0
+            while lengths.max() > md + EPS:
+                if time.perf_counter() >= deadline or (cancel is not None and cancel.is_set()):
+                    return None
+                stall += 1
+                if stall % rounds == 0:
+                    self.weight *= 2
+                    cost = float(self.pen(lengths).sum())
+                cand, cl, _ = self.ruin_recreate(routes)
+                if cand is None:
+                    continue
+                self.descend(cand, cl, deadline)
+                if self.pen(cl).sum() < cost - EPS:
+                    routes, lengths, cost, stall = cand, cl, float(self.pen(cl).sum()), 0
+            return routes
+        finally:
+            self.md, self.target, self.weight = md, np.inf, 0.0
+
+    def run(self, routes=None, time_limit=10, max_stall=2000, progress=None, cancel=None):
+        start = time.perf_counter()
+        deadline = start + time_limit
+        routes = [list(r) for r in routes] if routes else self.initial()
+        if routes is None and self.md < np.inf:
+            routes = self.repair(deadline, cancel)
+        if routes is None:
+            return None
+        lengths = np.array([self.route_len(r) for r in routes])
+        self.descend(routes, lengths, deadline)
+        best, best_cost = [list(r) for r in routes], float(lengths.sum())
+        cur, cur_cost = best, best_cost
+        stall = 0
+        if progress is not None:
+            progress({'objective': best_cost, 'runtime': time.perf_counter() - start, 'routes': best})
+        while time.perf_counter() < deadline and self.n > 2 and stall < max_stall:
+            if cancel is not None and cancel.is_set():
+                break
+            stall += 1
+            cand, cl, removed = self.ruin_recreate(cur)
+            if cand is None:
+                continue
+            touched = set(removed)
+            for r in cand:
+                for i, v in enumerate(r):
+                    if v in removed:
+                        touched.update(w for w in (r[i-1], r[(i+1) % len(r)]) if w != 0)
+            self.descend(cand, cl, deadline, touched)
+            cost = float(cl.sum())
+            # record-to-record acceptance, threshold shrinking with time
+            frac = (time.perf_counter() - start) / time_limit
+            if cost < cur_cost - EPS or cost < best_cost * (1 + 0.01 * (1 - frac)):
+                cur, cur_cost = cand, cost
+                if cost < best_cost - EPS:
+                    best, best_cost = [list(r) for r in cand], cost
+                    stall = 0
+                    if progress is not None:
+                        progress({'objective': best_cost, 'runtime': time.perf_counter() - start, 'routes': best})
+        return best
+
+
+def local_search(dist, m, forbidden=(), max_dist=0, time_limit=10, routes=None, seed=0, candidates=None,
+                 progress=None, cancel=None):
+    return LocalSearch(dist, m, forbidden, max_dist, seed, candidates).run(
+        routes, time_limit, progress=progress, cancel=cancel)
@@ -0,0 +1,709 @@
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import numpy as np
+from distances import candidate_arcs, distance_matrix
+from road_network import load_network, road_distance_matrix
+from vrp_decompose import kmeans_clusters, sweep_clusters
+from vrp_heuristics import clarke_wright
+from vrp_local_search import LocalSearch, local_search
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from matrix_form import LinearProgram, RowBuilder, add_to_gurobi, pick_backend, solve_highs
+from instance_io import load_vrp
+from solution_cache import canonical_hash
+from telemetry import Telemetry
+
+# taille maximale d'un groupe résolu exactement en mode décomposition
+TSP_MIP_MAX = 40
+# clients d'une tournée trop longue au-delà desquels on ne calcule plus sa
+# plus courte tournée (programmation dynamique en 2^k * k^2)
+SHORTEST_TOUR_MAX = 10
+
+# gurobipy n'est importé que pour construire un modèle Gurobi : HiGHS et les
+# heuristiques s'en passent. Codes d'état de Gurobi (GRB.OPTIMAL,
+# GRB.TIME_LIMIT, GRB.INFEASIBLE, GRB.INF_OR_UNBD, GRB.INTERRUPTED)
+STATUS_NAMES = {
+    2: 'optimal',
+    9: 'time_limit',
+    3: 'infeasible',
+    4: 'infeasible',
+    11: 'interrupted',
+}
+
+
+def read_config(path):
+    # JSON, CSV, .npz ou .npy (voir instance_io), validé
+    return load_vrp(path)
+
+
+def parse_forbidden(spec, n):
+    # "1-2,3-4" ou [[1, 2], [3, 4]] (1-based) -> set of 0-based arcs in both directions
+    if isinstance(spec, str):
+        spec = [route.split('-') for route in spec.split(',') if '-' in route]
+    arcs = set()
+    for pair in (() if spec is None else spec):
+        try:
+            a, b = map(int, pair)
+        except ValueError:
+            continue
+        if 1 <= a <= n and 1 <= b <= n:
+            arcs.add((a-1, b-1))
+            arcs.add((b-1, a-1))
+    return arcs
+
+
+def parse_config(cfg):
+    if 'coords' in cfg:
+        # instance en bloc (tableau n x 2, p. ex. lu d'un CSV ou d'un .npy)
+        coords = [tuple(c) for c in np.asarray(cfg['coords'], dtype=float).reshape(-1, 2).tolist()]
+        names = list(cfg.get('names') or [f"Loc{i+1}" for i in range(len(coords))])
+    else:
+        locs = cfg.get('locations', [])
+        names = [loc.get('name') or f"Loc{i+1}" for i, loc in enumerate(locs)]
+        coords = [(float(loc.get('x', 0)), float(loc.get('y', 0))) for loc in locs]
+    m = int(cfg.get('vehicles', 1))
+    max_dist = float(cfg.get('max_dist', 0) or 0)
+    forbidden = parse_forbidden(cfg.get('forbidden', ''), len(coords))
+    return names, coords, m, max_dist, forbidden
+
+
+def subtours(n, arcs):
+    # connected components of the selected arcs that do not reach the depot
+    adj = [[] for _ in range(n)]
+    for i, j in arcs:
+        adj[i].append(j)
+        adj[j].append(i)
+    comp = [-1] * n
+    for start in range(n):
+        if comp[start] >= 0:
+            continue
+        comp[start] = start
+        stack = [start]
+        while stack:
+            u = stack.pop()
+            for v in adj[u]:
+                if comp[v] < 0:
+                    comp[v] = start
+                    stack.append(v)
+    groups = {}
+    for i in range(1, n):
+        if comp[i] != comp[0]:
+            groups.setdefault(comp[i], []).append(i)
+    return list(groups.values())
+
+
+def route_length(dist, route):
+    return float(sum(dist[a, b] for a, b in zip(route, route[1:])))
+
+
+def shortest_tour(dist, stops):
+    # length of the shortest depot -> stops -> depot tour (Held-Karp)
+    k = len(stops)
+    idx = np.asarray(stops)
+    d = dist[np.ix_(idx, idx)]
+    best = np.full((1 << k, k), np.inf)
+    best[1 << np.arange(k), np.arange(k)] = dist[0, idx]
+    for mask in range(1, 1 << k):
+        row = best[mask]
+        if not np.isfinite(row).any():
+            continue
+        out = [b for b in range(k) if not mask >> b & 1]
+        if out:
+            step = (row[:, None] + d[:, out]).min(axis=0)
+            nxt = mask | (1 << np.array(out))
+            best[nxt, out] = np.minimum(best[nxt, out], step)
+    return float((best[-1] + dist[idx, 0]).min())
+
+
+def routes_from_arcs(arcs):
+    # les clients ont un seul successeur : on suit chaque départ du dépôt
+    succ = {}
+    starts = []
+    for i, j in arcs:
+        if i == 0:
+            starts.append(j)
+        else:
+            succ[i] = j
+    routes = []
+    for j in starts:
+        path = [0]
+        while j != 0 and j not in path:
+            path.append(j)
+            j = succ.get(j, 0)
+        path.append(0)
+        routes.append(path)
+    return routes
+
+
+def admissible_arcs(dist, forbidden, md, candidates=None):
+    # arcs qui peuvent apparaître dans une solution : pas de boucle, pas d'arc
+    # interdit, et dépôt -> i -> j -> dépôt compatible avec la distance maximale
+    n = len(dist)
+    ok = ~np.eye(n, dtype=bool)
+    for a, b in forbidden:
+        ok[a, b] = False
+    if md > 0:
+        via = dist[0, :, None] + dist + dist[None, :, 0]
+        # pour les arcs touchant le dépôt, c'est l'aller-retour dépôt -> i -> dépôt
+        via[0, :] = dist[0, :] + dist[:, 0]
+        via[:, 0] = dist[0, :] + dist[:, 0]
+        ok &= via <= md + 1e-9
+    if candidates is not None:
+        ok &= candidates
+    ii, jj = np.nonzero(ok)
+    return list(zip(ii.tolist(), jj.tolist()))
+
+
+def arc_columns(arcs, m):
+    # colonnes du modèle matriciel : x[i,j,k] en position k * |A| + a
+    ij = np.array(arcs, dtype=np.int64).reshape(-1, 2)
+    return np.tile(ij[:, 0], m), np.tile(ij[:, 1], m), np.repeat(np.arange(m), len(ij))
+
+
+def three_index_program(dist, m, md, arcs, formulation):
+    # modèle à trois indices sous forme matricielle (voir matrix_form.LinearProgram)
+    n = len(dist)
+    ii, jj, kk = arc_columns(arcs, m)
+    N = len(ii)
+    col = np.arange(N)
+    mtz = formulation == 'mtz'
+    ncols = N + (n * m if mtz else 0)
+    rows = RowBuilder(ncols)
+    into, out = jj != 0, ii != 0
+
+    # chaque client (j≠0) doit être visité exactement une fois par une des m voitures
+    rows.add(jj[into] - 1, col[into], 1, '=', np.ones(n - 1))
+
+    # chaque véhicule k part du dépôt (0) et y revient
+    rows.add(kk[~out], col[~out], 1, '=', np.ones(m))
+    rows.add(kk[~into], col[~into], 1, '=', np.ones(m))
+
+    # conservation de flux : si une voiture arrive en j, elle doit aussi en repartir
+    rows.add(np.concatenate([kk[into] * (n - 1) + jj[into] - 1, kk[out] * (n - 1) + ii[out] - 1]),
+             np.concatenate([col[into], col[out]]),
+             np.concatenate([np.ones(into.sum()), -np.ones(out.sum())]),
+             '=', np.zeros(m * (n - 1)))
+
+    # contrainte de distance maximale par véhicule
+    if md > 0:
+        rows.add(kk, col, dist[ii, jj], '<', np.full(m, md))
+
+    lb = np.zeros(ncols)
+    ub = np.ones(ncols)
+    vtype = np.full(ncols, 'B')
+    if mtz:
+        # variable continue t[i,k] (colonne N + k * n + i) pour l'ordre de visite ;
+        # t[0,k] = 0 est une borne plutôt qu'une contrainte
+        ub[N:] = np.inf
+        ub[N + np.arange(m) * n] = 0
+        vtype[N:] = 'C'
+        # élimination des sous-tours (MTZ) : si k va i->j, alors t[j,k] >= t[i,k] + 1
+        M = n  # grosse constante
+        r = np.arange(into.sum())
+        rows.add(np.concatenate([r, r, r]),
+                 np.concatenate([N + kk[into] * n + jj[into], N + kk[into] * n + ii[into], col[into]]),
+                 np.concatenate([np.ones(len(r)), -np.ones(len(r)), np.full(len(r), -M)]),
+                 '>', np.full(len(r), 1 - M))
+
+    # objectif : minimiser la distance totale parcourue
+    c = np.zeros(ncols)
+    c[:N] = dist[ii, jj]
+    A, sense, rhs = rows.build()
+    return LinearProgram(c, A, sense, rhs, lb, ub, vtype)
+
+
+def build_three_index(model, dist, m, md, arcs, formulation, telemetry=None, lp=None):
+    from gurobipy import GRB, quicksum, tupledict, tuplelist
+    n = len(dist)
+    if formulation not in ('mtz', 'lazy'):
+        raise ValueError(f"Unknown formulation: {formulation}")
+    # variable binaire x[i,j,k] = 1 si le véhicule k va de i à j (arcs admissibles seulement) ;
+    # lp : le programme de cette formulation s'il est déjà construit
+    if lp is None:
+        lp = three_index_program(dist, m, md, arcs, formulation)
+    v = add_to_gurobi(model, lp, 'x', telemetry).tolist()
+    x = tupledict(zip(((i, j, k) for k in range(m) for i, j in arcs), v))
+
+    callback = t = None
+    if formulation == 'mtz':
+        t = tupledict(zip(((i, k) for k in range(m) for i in range(n)), v[len(x):]))
+    else:
+        # sous-tours éliminés à la demande : pour chaque composante S sans dépôt,
+        # somme des arcs internes à S (tous véhicules) <= |S| - 1
+        model.setParam('LazyConstraints', 1)
+        arcs = tuplelist(arcs)
+
+        def callback(model, where):
+            if where != GRB.Callback.MIPSOL:
+                return
+            vals = model.cbGetSolution(x)
+            used = {(i, j) for (i, j, k), v in vals.items() if v > 0.5}
+            cuts = subtours(n, used)
+            for S in cuts:
+                inside = set(S)
+                model.cbLazy(
+                    quicksum(x[i, j, k] for i in S for _, j in arcs.select(i, '*') if j in inside
+                             for k in range(m))
+                    <= len(S) - 1
+                )
+            return len(cuts)
+    return x, t, callback
+
+
+def two_index_program(dist, m, arcs):
+    # flotte homogène : x[i,j] = 1 si un véhicule quelconque va de i à j
+    n = len(dist)
+    ii, jj, _ = arc_columns(arcs, 1)
+    col = np.arange(len(ii))
+    rows = RowBuilder(len(ii))
+    into, out = jj != 0, ii != 0
+    # chaque client a exactement un prédécesseur et un successeur
+    rows.add(jj[into] - 1, col[into], 1, '=', np.ones(n - 1))
+    rows.add(ii[out] - 1, col[out], 1, '=', np.ones(n - 1))
+    # taille de flotte : degré du dépôt = m
+    rows.add(np.zeros((~out).sum()), col[~out], 1, '=', m)
+    rows.add(np.zeros((~into).sum()), col[~into], 1, '=', m)
+    A, sense, rhs = rows.build()
+    return LinearProgram(dist[ii, jj], A, sense, rhs, np.zeros(len(ii)), np.ones(len(ii)),
+                         np.full(len(ii), 'B'))
+
+
+def build_two_index(model, dist, m, md, arcs, telemetry=None, lp=None):
+    from gurobipy import GRB, quicksum, tupledict, tuplelist
+    n = len(dist)
+    if lp is None:
+        lp = two_index_program(dist, m, arcs)
+    v = add_to_gurobi(model, lp, 'x', telemetry).tolist()
+    x = tupledict(zip(arcs, v))
+    arcs = tuplelist(arcs)
+
+    # sous-tours et longueur de tournée ajoutés à la demande
+    model.setParam('LazyConstraints', 1)
+
+    def callback(model, where):
+        if where != GRB.Callback.MIPSOL:
+            return
+        vals = model.cbGetSolution(x)
+        used = [a for a, v in vals.items() if v > 0.5]
+        cuts = subtours(n, used)
+        for S in cuts:
+            inside = set(S)
+            model.cbLazy(quicksum(x[i, j] for i in S for _, j in arcs.select(i, '*') if j in inside)
+                         <= len(S) - 1)
+        if md > 0:
+            for r in routes_from_arcs(used):
+                path = list(zip(r, r[1:]))
+                if sum(dist[i, j] for i, j in path) > md + 1e-6:
+                    S = r[1:-1]
+                    if len(S) <= SHORTEST_TOUR_MAX and shortest_tour(dist, S) > md + 1e-6:
+                        # aucune tournée ne peut desservir tous les clients de S
+                        # (inégalité triangulaire : une tournée plus large est
+                        # encore plus longue) : S est partagé entre au moins
+                        # deux véhicules
+                        inside = set(S)
+                        model.cbLazy(quicksum(x[i, j] for i in S for _, j in arcs.select(i, '*') if j in inside)
+                                     <= len(S) - 2)
+                    else:
+                        # sinon, la tournée trouvée ne peut pas réutiliser tous ses arcs
+                        model.cbLazy(quicksum(x[a] for a in path) <= len(path) - 1)
+                    cuts.append(r)
+        return len(cuts)
+
+    return x, None, callback
+
+
+def set_mip_start(model, x, t, routes):
+    # charge des tournées comme solution initiale (véhicule k = tournée k)
+    model.setAttr('Start', list(x.values()), [0] * len(x))
+    three_index = len(next(iter(x))) == 3
+    for k, r in enumerate(routes):
+        for pos, (i, j) in enumerate(zip(r, r[1:])):
+            key = (i, j, k) if three_index else (i, j)
+            if key in x:
+                x[key].Start = 1
+            if t is not None and j != 0:
+                t[j, k].Start = pos + 1
+    if t is not None:
+        for k in range(len(routes)):
+            t[0, k].Start = 0
+
+
+def relative_gap(obj, bound):
+    if obj is None or bound is None or abs(obj) < 1e-10:
+        return None
+    return abs(obj - bound) / abs(obj)
+
+
+def monitor(inner, progress, cancel, interval=0.5, x=None, telemetry=None):
+    # wraps the formulation callback: streams incumbent/bound/gap to `progress`
+    # and stops the solve as soon as `cancel` (a threading.Event) is set; with
+    # the arc variables `x`, each new incumbent also carries its routes. The
+    # same points go to the trajectory of `telemetry`, with the lazy
+    # constraints the formulation callback returns it added and Gurobi's
+    # cut and node counts.
+    if progress is None and cancel is None and telemetry is None:
+        return inner
+    from gurobipy import GRB
+    last = [-interval]
+
+    def callback(model, where):
+        added = inner(model, where) if inner else 0
+        if cancel is not None and cancel.is_set():
+            model.terminate()
+            return
+        if added and telemetry is not None:
+            telemetry.lazy_round(added)
+        if progress is None and telemetry is None:
+            return
+        info = {}
+        if where == GRB.Callback.MIPSOL and not added:
+            obj = model.cbGet(GRB.Callback.MIPSOL_OBJ)
+            bound = model.cbGet(GRB.Callback.MIPSOL_OBJBND)
+            best = model.cbGet(GRB.Callback.MIPSOL_OBJBST)
+            nodes = model.cbGet(GRB.Callback.MIPSOL_NODCNT)
+            if x is not None and obj < best and progress is not None:
+                vals = model.cbGetSolution(x)
+                info['routes'] = routes_from_arcs(key[:2] for key, v in vals.items() if v > 0.5)
+            obj = min(obj, best)
+        elif where == GRB.Callback.MIP:
+            if telemetry is not None:
+                telemetry.mip_progress(model.cbGet(GRB.Callback.MIP_CUTCNT), model.cbGet(GRB.Callback.MIP_NODCNT))
+            now = model.cbGet(GRB.Callback.RUNTIME)
+            if now - last[0] < interval or model.cbGet(GRB.Callback.MIP_SOLCNT) == 0:
+                return
+            obj = model.cbGet(GRB.Callback.MIP_OBJBST)
+            bound = model.cbGet(GRB.Callback.MIP_OBJBND)
+            nodes = model.cbGet(GRB.Callback.MIP_NODCNT)
+        else:
+            return
+        if not abs(bound) < GRB.INFINITY:
+            # no bound yet (Gurobi reports -1e100 at the first incumbents)
+            bound = None
+        last[0] = model.cbGet(GRB.Callback.RUNTIME)
+        if telemetry is not None:
+            telemetry.incumbent(last[0], obj, bound, nodes)
+        if progress is not None:
+            progress(dict(info, objective=obj, bound=bound, gap=relative_gap(obj, bound), runtime=last[0]))
+
+    return callback
+
+
+def make_result(names, coords, status, dist=None, routes=None, **extra):
+    result = {
+        'names': names,
+        'coords': coords,
+        'status': status,
+        'objective': None,
+        'gap': None,
+        'runtime': None,
+        'routes': routes,
+        'lengths': None,
+    }
+    if routes is not None:
+        result['lengths'] = [route_length(dist, r) for r in routes]
+        result['objective'] = sum(result['lengths'])
+    result.update(extra)
+    return result
+
+
+def routes_feasible(routes, dist, m, forbidden, md):
+    # vérifie qu'un plan (p. ex. issu du cache) est valable pour l'instance courante
+    if not routes or len(routes) != m:
+        return False
+    if sorted(v for r in routes for v in r[1:-1]) != list(range(1, len(dist))):
+        return False
+    for r in routes:
+        if any(a in forbidden for a in zip(r, r[1:])):
+            return False
+        if md > 0 and route_length(dist, r) > md + 1e-6:
+            return False
+    return True
+
+
+def instance_signature(coords, m, md, forbidden, neighbours=0, road=None):
+    # forme canonique de l'instance pour le cache (les noms n'interviennent pas) ;
+    # road : empreinte du réseau routier, absente pour les distances euclidiennes
+    sig = {
+        'coords': [[round(x, 9), round(y, 9)] for x, y in coords],
+        'vehicles': m,
+        'max_dist': round(md, 9),
+        'forbidden': sorted([a, b] for a, b in forbidden if a < b),
+        'neighbours': neighbours,
+    }
+    if road:
+        sig['road_network'] = road
+    return sig
+
+
+def cache_lookup(cache, sig, options):
+    # une solution optimale, ou obtenue avec exactement les mêmes options de
+    # résolution, est rendue telle quelle ; sinon (limite de temps atteinte
+    # avec d'autres options, instance voisine) elle ne sert que de point de
+    # départ. Rend (clé, famille, entrée de l'instance, réutilisable, voisine)
+    key, family = canonical_hash(sig), canonical_hash(sig['coords'])
+    hit = cache.get('vrp', key)
+    if hit and (hit['status'] == 'optimal' or hit.get('options') == options):
+        return key, family, hit, True, None
+    return key, family, hit, False, hit or cache.nearest('vrp', family)
+
+
+def cache_store(cache, key, family, hit, options, result):
+    # la meilleure solution connue de l'instance reste en cache
+    if result['routes'] is None:
+        return
+    if hit is None or hit['objective'] is None or result['objective'] <= hit['objective'] + 1e-9:
+        cache.put('vrp', key, family, {
+            'status': result['status'], 'method': options['method'], 'options': options,
+            'routes': result['routes'], 'objective': result['objective'], 'gap': result['gap'],
+        })
+
+
+def solve_mip_highs(lp, arcs, m, time_limit, mip_gap, verbose, telemetry):
+    # même modèle MTZ (lp, de three_index_program) résolu par HiGHS (sans
+    # limite de licence) ; pas de solution de départ, de progression ni d'annulation
+    telemetry.program(lp)
+    with telemetry.phase('optimize'):
+        res = solve_highs(lp, time_limit, mip_gap, verbose)
+    telemetry.highs_search(res)
+    if res['x'] is None:
+        return res['status'], None, {'runtime': res['runtime'], 'backend': 'highs'}
+    ii, jj, _ = arc_columns(arcs, m)
+    used = res['x'][:len(ii)] > 0.5
+    routes = routes_from_arcs(zip(ii[used].tolist(), jj[used].tolist()))
+    return res['status'], routes, {'objective': res['objective'], 'gap': res['gap'], 'runtime': res['runtime'],
+                                   'backend': 'highs'}
+
+
+def solve_mip(dist, m, md, forbidden, candidates, formulation, start_routes, time_limit, mip_gap,
+              threads, verbose, progress, cancel, telemetry, env=None, backend='gurobi'):
+    # construction du modèle pour le VRP (la phase 'build' comprend
+    # 'variables' et 'constraints')
+    clock = time.perf_counter()
+    arcs = admissible_arcs(dist, forbidden, md, candidates)
+    lp = None
+    if backend != 'gurobi':
+        if formulation != 'mtz' and backend == 'highs':
+            # coupes paresseuses : rappels Gurobi indispensables
+            raise ValueError(f"The {formulation} formulation needs Gurobi; use formulation='mtz' with HiGHS")
+        # programme construit une seule fois : il sert au choix du moteur
+        # puis au moteur retenu
+        lp = (two_index_program(dist, m, arcs) if formulation == 'two_index'
+              else three_index_program(dist, m, md, arcs, formulation))
+        if pick_backend(lp, backend) == 'highs':
+            if formulation != 'mtz':
+                # trop grand pour la licence Gurobi : sans rappels, HiGHS
+                # résout la formulation MTZ
+                lp = three_index_program(dist, m, md, arcs, 'mtz')
+                telemetry.labels['formulation'] = 'mtz'
+            telemetry.phases['build'] = time.perf_counter() - clock
+            if progress is not None:
+                progress({'backend': 'highs', 'runtime': 0.0})
+            return solve_mip_highs(lp, arcs, m, time_limit, mip_gap, verbose, telemetry)
+    from gurobipy import Model
+    model = Model('VRP', env=env)
+    model.setParam('OutputFlag', int(verbose))
+    model.setParam('TimeLimit', time_limit)  # limite de temps
+    model.setParam('MIPGap', mip_gap)        # tolérance d'optimalité
+    if threads:
+        model.setParam('Threads', threads)
+    if formulation == 'two_index':
+        x, t, callback = build_two_index(model, dist, m, md, arcs, telemetry, lp)
+    else:
+        x, t, callback = build_three_index(model, dist, m, md, arcs, formulation, telemetry, lp)
+    if start_routes:
+        set_mip_start(model, x, t, start_routes)
+    model.update()
+    telemetry.phases['build'] = time.perf_counter() - clock
+
+    # résolution
+    with telemetry.phase('optimize'):
+        model.optimize(monitor(callback, progress, cancel, x=x, telemetry=telemetry))
+    telemetry.gurobi_search(model)
+    status = STATUS_NAMES.get(model.status, str(model.status))
+    if model.SolCount == 0:
+        return status, None, {'runtime': model.Runtime, 'backend': 'gurobi'}
+    with telemetry.phase('extract'):
+        sol = model.getAttr('x', x)
+        routes = routes_from_arcs(key[:2] for key, v in sol.items() if v > 0.5)
+    return status, routes, {'objective': model.ObjVal, 'gap': model.MIPGap, 'runtime': model.Runtime,
+                            'backend': 'gurobi'}
+
+
+def solve_cluster(args):
+    # tâche d'un processus : une seule tournée sur le dépôt (indice 0) et un
+    # groupe de clients ; TSP exact (deux indices, coupes paresseuses) pour les
+    # petits groupes, recherche locale au-delà
+    dist, md, forbidden, time_limit, mip_gap = args
+    if len(dist) - 1 <= TSP_MIP_MAX:
+        start = clarke_wright(dist, 1, forbidden, md)
+        status, routes, _ = solve_mip(dist, 1, md, forbidden, None, 'two_index', start, time_limit, mip_gap,
+                                      1, False, None, None, Telemetry('vrp'))
+        if routes:
+            return routes[0]
+        if status == 'infeasible':
+            return None
+    routes = local_search(dist, 1, forbidden, md, time_limit=time_limit)
+    return routes[0] if routes else None
+
+
+def solve_decomposed(coords, dist, m, md, forbidden, candidates, clustering, workers, time_limit, mip_gap,
+                     progress, cancel, telemetry):
+    # grouper d'abord, router ensuite : m groupes de clients (balayage angulaire
+    # ou k-means équilibré), un TSP par groupe dans des processus séparés, puis
+    # une recherche locale entre tournées ; la moitié du temps va aux groupes,
+    # le reste à l'amélioration globale
+    deadline = time.perf_counter() + time_limit
+    with telemetry.phase('cluster'):
+        if clustering == 'sweep':
+            clusters = sweep_clusters(coords, m)
+        elif clustering == 'kmeans':
+            clusters = kmeans_clusters(coords, m)
+        else:
+            raise ValueError(f"Unknown clustering: {clustering}")
+    if clusters is None:
+        return 'infeasible', None
+
+    clock = time.perf_counter()
+    workers = max(1, min(workers or os.cpu_count() or 1, m))
+    # chaque vague de `workers` groupes dispose d'une part égale du temps
+    share = time_limit / 2 / math.ceil(m / workers)
+    jobs = []
+    for group in clusters:
+        idx = [0] + group
+        local = {(a, b) for a in range(len(idx)) for b in range(len(idx)) if (idx[a], idx[b]) in forbidden}
+        jobs.append((np.ascontiguousarray(dist[np.ix_(idx, idx)]), md, local, share, mip_gap))
+    routes = [None] * m
+    stranded = []
+    pool = None
+    if workers > 1 and m > 1:
+        # spawn : sûr depuis le fil de calcul de l'interface comme sous Windows
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        if pool is None:
+            finished = ((k, solve_cluster(job)) for k, job in enumerate(jobs))
+        else:
+            futures = {pool.submit(solve_cluster, job): k for k, job in enumerate(jobs)}
+            finished = ((futures[f], f.result()) for f in as_completed(futures))
+        for done, (k, r) in enumerate(finished, 1):
+            if r is None:
+                # aucune tournée admissible pour ce groupe (distance maximale) :
+                # ses clients seront répartis sur l'ensemble des tournées
+                routes[k] = [0, 0]
+                stranded += clusters[k]
+            else:
+                routes[k] = [clusters[k][v - 1] if v else 0 for v in r]
+            if progress is not None:
+                progress({'clusters': done, 'of': m, 'runtime': time.perf_counter() - clock})
+            if cancel is not None and cancel.is_set():
+                return 'interrupted', None
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    telemetry.phases['routes'] = time.perf_counter() - clock
+
+    # amélioration entre tournées (LNS + déplacements, échanges, 2-opt)
+    with telemetry.phase('improve'):
+        search = LocalSearch(dist, m, forbidden, md, candidates=candidates)
+        if stranded:
+            # insertion au moindre coût des clients sans tournée ; à défaut
+            # la recherche part de sa propre solution initiale (économies)
+            lengths = np.array([search.route_len(r) for r in routes])
+            if not (search.cheapest_insertion(routes, lengths, stranded) and search.feasible(routes, lengths)):
+                routes = None
+        routes = search.run(routes, max(1.0, deadline - time.perf_counter()), cancel=cancel)
+    return ('heuristic', routes) if routes_feasible(routes, dist, m, forbidden, md) else ('no_solution', None)
+
+
+def solve(cfg, method='mip', formulation='mtz', warm_start=True, neighbours=0, time_limit=60, mip_gap=0.05,
+          threads=0, verbose=True, progress=None, cancel=None, cache=None, clustering='kmeans', workers=0,
+          env=None, backend=None):
+    # backend : 'gurobi', 'highs' ou 'auto' (Gurobi si sa licence accepte la
+    # taille du modèle) ; par défaut la clé "backend" de la configuration,
+    # sinon Gurobi. HiGHS n'a ni solution de départ, ni progression, ni
+    # annulation : `progress` reçoit {'backend': 'highs'} avant sa résolution
+    # durée de chaque phase (result['timings']) et statistiques du solveur
+    # (result['telemetry'], voir telemetry.py)
+    backend = backend or cfg.get('backend', 'gurobi')
+    mip = method == 'mip'
+    tel = Telemetry('vrp', method=method, formulation=formulation if mip else '', backend=backend if mip else '')
+    timings = tel.phases
+    with tel.phase('parse'):
+        names, coords, m, md, forbidden = parse_config(cfg)
+        n = len(coords)
+        if n < 2:
+            raise ValueError('At least a depot and one customer are required')
+        if method not in ('mip', 'savings', 'local_search', 'decompose'):
+            raise ValueError(f"Unknown method: {method}")
+    # distances à vol d'oiseau, ou par la route si la configuration nomme un
+    # réseau routier (voir road_network.py)
+    road = cfg.get('road_network')
+    with tel.phase('distance'):
+        dist = road_distance_matrix(road, coords, workers) if road else distance_matrix(coords)
+    size = {'locations': n, 'vehicles': m}
+
+    # cache : voir cache_lookup
+    previous = None
+    if cache is not None:
+        sig = instance_signature(coords, m, md, forbidden, neighbours, load_network(road).key if road else None)
+        options = {'method': method, 'formulation': formulation if mip else None,
+                   'backend': backend if mip else None, 'warm_start': warm_start if mip else None,
+                   'clustering': clustering if method == 'decompose' else None,
+                   'mip_gap': mip_gap if method in ('mip', 'decompose') else None,
+                   'time_limit': time_limit if method != 'savings' else None}
+        key, family, hit, reuse, near = cache_lookup(cache, sig, options)
+        if reuse:
+            result = make_result(names, coords, hit['status'], dist, hit['routes'], objective=hit['objective'],
+                                 gap=hit['gap'], runtime=0.0, cached=True, timings=timings)
+            result['telemetry'] = tel.record(status=hit['status'], objective=hit['objective'], gap=hit['gap'],
+                                             cached=True, size=size)
+            return result
+        if near and routes_feasible(near['routes'], dist, m, forbidden, md):
+            previous = near['routes']
+
+    # graphe creux des k plus proches voisins (0 = dense)
+    candidates = candidate_arcs(dist, neighbours, forbidden) if neighbours else None
+    # une heuristique sans solution ne prouve rien, sauf s'il y a plus de
+    # véhicules que de clients (chaque véhicule sert au moins un client)
+    unsolved = 'infeasible' if n - 1 < m else 'no_solution'
+    start = time.perf_counter()
+    extra = {}
+    if method == 'savings':
+        # plan rapide : heuristique seule, sans Gurobi
+        routes = clarke_wright(dist, m, forbidden, md, candidates)
+        status = 'heuristic' if routes else unsolved
+    elif method == 'local_search':
+        # métaheuristique (LNS + recherche locale) bornée par time_limit
+        routes = local_search(dist, m, forbidden, md, time_limit=time_limit, routes=previous,
+                              candidates=candidates, progress=progress, cancel=cancel)
+        status = 'heuristic' if routes else unsolved
+    elif method == 'decompose':
+        status, routes = solve_decomposed(coords, dist, m, md, forbidden, candidates, clustering, workers,
+                                          time_limit, mip_gap, progress, cancel, tel)
+    else:
+        start_routes = previous
+        if start_routes is None and warm_start:
+            start_routes = clarke_wright(dist, m, forbidden, md, candidates)
+            timings['warm_start'] = time.perf_counter() - start
+        status, routes, extra = solve_mip(dist, m, md, forbidden, candidates, formulation, start_routes,
+                                          time_limit, mip_gap, threads, verbose, progress, cancel, tel, env,
+                                          backend)
+        tel.labels['backend'] = extra.get('backend', backend)
+    timings['solve'] = time.perf_counter() - start
+    extra.setdefault('runtime', time.perf_counter() - start)
+    result = make_result(names, coords, status, dist, routes, timings=timings, **extra)
+    result['telemetry'] = tel.record(status=status, objective=result['objective'], gap=result['gap'], size=size)
+
+    if cache is not None:
+        cache_store(cache, key, family, hit, options, result)
+    return result
+
+
+def solve_file(path, **kwargs):
+    result = solve(read_config(path), **kwargs)
+    result['instance'] = Path(path).stem
+    return result
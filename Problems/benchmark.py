@@ -0,0 +1,196 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = Path(__file__).resolve().parent
+sys.path[:0] = [str(ROOT / 'VRP'), str(ROOT / 'Production_Planning')]
+
+VRP_SIZES = [10, 15, 20, 50, 100, 200, 500, 1000]
+PP_HORIZONS = [12, 100, 1000, 10000, 100000]
+PLANT_PRODUCTS = [10, 100, 500]
+MIP_MAX_SIZE = 20
+
+
+def random_vrp(n, vehicles, seed=0, layout='uniform', max_dist=0):
+    # depot in the middle of a 100 x 100 square; clustered layouts draw stops
+    # around a few random centres
+    rng = np.random.default_rng(seed)
+    if layout == 'clustered':
+        centres = rng.uniform(10, 90, size=(max(2, n // 25), 2))
+        pts = centres[rng.integers(len(centres), size=n)] + rng.normal(0, 5, size=(n, 2))
+    else:
+        pts = rng.uniform(0, 100, size=(n, 2))
+    pts[0] = (50, 50)
+    return {
+        'description': f'{layout} n={n} seed={seed}',
+        'locations': [{'name': f'L{i}', 'x': float(x), 'y': float(y)} for i, (x, y) in enumerate(pts)],
+        'vehicles': vehicles,
+        'max_dist': max_dist,
+        'forbidden': '',
+    }
+
+
+def random_pp(T, seed=0):
+    # seasonal demand with noise, production capacity 50% above average demand
+    # (enough slack to build stock ahead of the first peak)
+    rng = np.random.default_rng(seed)
+    t = np.arange(T)
+    demands = np.maximum(0, 100 + 40 * np.sin(2 * np.pi * t / 52) + rng.normal(0, 10, T))
+    return {
+        'description': f'seasonal T={T} seed={seed}',
+        'periods': T,
+        'prod_cost': 2.0,
+        'inv_cost': 0.5,
+        'init_inv': 0.0,
+        'prod_cap': float(demands.mean() * 1.5),
+        'inv_cap': 1000000.0,
+        'demands': demands.round(2).tolist(),
+    }
+
+
+def random_plant(P, T=52, resources=3, seed=0):
+    # P products sharing `resources` machines (production) and one warehouse
+    # (inventory); machine capacity 50% above average load
+    rng = np.random.default_rng(seed)
+    products = []
+    for i in range(P):
+        cfg = random_pp(T, seed=seed * 100003 + i)
+        products.append({'name': f'SKU{i}', 'demands': cfg['demands'],
+                         'prod_cost': float(rng.uniform(1, 5)), 'inv_cost': float(rng.uniform(0.05, 0.5))})
+    load = np.mean([np.mean(pr['demands']) for pr in products]) * P
+    machines = [{'name': f'M{r}', 'usage': rng.uniform(0.5, 1.5, P).tolist(), 'capacity': float(load * 1.5)}
+                for r in range(resources)]
+    warehouse = {'name': 'Warehouse', 'applies_to': 'inventory', 'usage': [1.0] * P, 'capacity': float(load * 4)}
+    return {'description': f'plant P={P} T={T} seed={seed}', 'periods': T, 'products': products,
+            'resources': machines + [warehouse]}
+
+
+def bundled_cases():
+    for fn in sorted((ROOT / 'VRP' / 'VRPexemples').glob('*.json')):
+        for formulation in ('mtz', 'lazy', 'two_index'):
+            yield {'case': fn.stem, 'problem': 'vrp', 'file': str(fn), 'method': 'mip', 'formulation': formulation}
+    for fn in sorted((ROOT / 'Production_Planning' / 'PPexemples').glob('*.json')):
+        for method in ('lp', 'native'):
+            yield {'case': fn.stem, 'problem': 'pp', 'file': str(fn), 'method': method}
+
+
+def synthetic_cases(sizes, horizons, seeds, products=()):
+    for n in sizes:
+        vehicles = max(2, n // 20)
+        for layout in ('uniform', 'clustered'):
+            for seed in range(seeds):
+                base = {'case': f'vrp-{layout}-{n}-{seed}', 'problem': 'vrp', 'n': n,
+                        'generator': {'n': n, 'vehicles': vehicles, 'seed': seed, 'layout': layout}}
+                if n <= MIP_MAX_SIZE:
+                    for formulation in ('mtz', 'lazy', 'two_index'):
+                        yield dict(base, method='mip', formulation=formulation)
+                yield dict(base, method='savings')
+                yield dict(base, method='local_search')
+    for T in horizons:
+        for seed in range(seeds):
+            for method in ('lp', 'native'):
+                yield {'case': f'pp-{T}-{seed}', 'problem': 'pp', 'n': T, 'method': method,
+                       'generator': {'T': T, 'seed': seed}}
+    for P in products:
+        for seed in range(seeds):
+            yield {'case': f'plant-{P}x52-{seed}', 'problem': 'pp', 'n': P, 'method': 'lp',
+                   'generator': {'P': P, 'seed': seed}}
+
+
+def preload():
+    # import the solvers before the clock starts: wall times exclude start-up
+    import vrp_solver  # noqa: F401
+    import pp_solver  # noqa: F401
+
+
+def run_case(case, time_limit):
+    # parse time covers reading the file (or generating the instance)
+    record = dict(case)
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        clock = time.perf_counter()
+        if case['problem'] == 'vrp':
+            from vrp_solver import read_config, solve
+            cfg = read_config(case['file']) if 'file' in case else random_vrp(**case['generator'])
+            load = time.perf_counter() - clock
+            result = solve(cfg, method=case['method'], formulation=case.get('formulation', 'mtz'),
+                           time_limit=time_limit, verbose=False)
+            record['n'] = len(cfg['locations'])
+        else:
+            from pp_solver import solve
+            from instance_io import load_pp
+            if 'file' in case:
+                cfg = load_pp(case['file'])
+            elif 'P' in case['generator']:
+                cfg = random_plant(**case['generator'])
+            else:
+                cfg = random_pp(**case['generator'])
+            load = time.perf_counter() - clock
+            result = solve(cfg, method=case['method'], verbose=False)
+            if 'products' not in cfg:
+                record['n'] = int(cfg.get('periods', len(cfg.get('demands', []))))
+        timings = dict(result.get('timings', {}))
+        timings['parse'] = timings.get('parse', 0.0) + load
+        record.update({
+            'status': result['status'],
+            'objective': result['objective'],
+            'gap': result.get('gap'),
+            'timings': timings,
+        })
+    except Exception as e:
+        record.update({'status': 'error', 'error': f'{type(e).__name__}: {e}'})
+    record['wall'] = time.perf_counter() - start
+    record['peak_python_mb'] = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    # ru_maxrss is in KiB on Linux; includes solver-side (C) allocations
+    if resource is not None:
+        record['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the VRP and production planning solvers.')
+    parser.add_argument('-o', '--out', default='bench_results.jsonl', help='JSON lines output file')
+    parser.add_argument('--suite', choices=['bundled', 'synthetic', 'all'], default='all')
+    parser.add_argument('--sizes', type=int, nargs='+', default=VRP_SIZES, help='VRP location counts')
+    parser.add_argument('--horizons', type=int, nargs='+', default=PP_HORIZONS, help='PP period counts')
+    parser.add_argument('--products', type=int, nargs='+', default=PLANT_PRODUCTS,
+                        help='multi-product plant sizes (52 weeks, 3 machines + warehouse)')
+    parser.add_argument('--seeds', type=int, default=1)
+    parser.add_argument('--methods', nargs='+', help='only run these methods (mip, savings, local_search, lp, native)')
+    parser.add_argument('--time-limit', type=float, default=10)
+    args = parser.parse_args(argv)
+
+    cases = []
+    if args.suite in ('bundled', 'all'):
+        cases.extend(bundled_cases())
+    if args.suite in ('synthetic', 'all'):
+        cases.extend(synthetic_cases(args.sizes, args.horizons, args.seeds, args.products))
+    if args.methods:
+        cases = [c for c in cases if c['method'] in args.methods]
+
+    # one fresh process per case so peak RSS and caches are not shared between cases
+    with open(args.out, 'w', encoding='utf-8') as out, \
+            ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1, initializer=preload) as pool:
+        for case in cases:
+            record = pool.submit(run_case, case, args.time_limit).result()
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+            label = f"{record['case']} [{record['method']}{'/' + record['formulation'] if 'formulation' in record else ''}]"
+            print(f"{label}: {record['status']} objective={record.get('objective')} wall={record['wall']:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
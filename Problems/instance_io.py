@@ -0,0 +1,293 @@
+import csv
+import json
+import math
+from array import array
+from pathlib import Path
+import numpy as np
+
+# Instance files shared by the VRP and production-planning tools.
+#   .json  the configuration the apps save (any of UTF-8, UTF-8 with BOM,
+#          UTF-16 or Latin-1)
+#   .csv   one row per stop (VRP: name,x,y, the depot first) or per period
+#          (PP: one demand column per product), streamed row by row
+#   .npz   compact bundle of arrays: VRP coords (n, 2) [+ names, vehicles,
+#          max_dist, forbidden (k, 2) 1-based pairs]; PP demands (P, T) [+
+#          names and per-product prod_cost, inv_cost, init_inv, prod_cap, inv_cap]
+#   .npy   one array, memory-mapped: VRP coords or PP demands
+# A VRP config may name a road network file ("road_network", relative to the
+# instance) for driving distances; see VRP/road_network.py.
+# Bulk formats come back as configs holding arrays ('coords' for the VRP,
+# products with array demands for PP) that the solvers read without a
+# per-value Python loop. Keyword parameters fill in what a file lacks.
+
+FORMATS = ('.json', '.csv', '.npz', '.npy')
+PP_FIELDS = ('prod_cost', 'inv_cost', 'init_inv', 'prod_cap', 'inv_cap')
+# pp_solver.parse_config's defaults
+PP_DEFAULTS = {'prod_cost': 1.0, 'inv_cost': 0.5, 'init_inv': 0.0, 'prod_cap': 1000000.0, 'inv_cap': 1000000.0}
+
+
+def read_text(path):
+    # Load raw bytes and detect encoding (some examples are UTF-16)
+    raw = Path(path).read_bytes()
+    if raw.startswith(b'\xff\xfe') or raw.startswith(b'\xfe\xff'):
+        return raw.decode('utf-16')
+    try:
+        return raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def read_json(path):
+    content = read_text(path)
+    if not content.strip():
+        raise ValueError('Configuration file is empty')
+    return json.loads(content)
+
+
+def _number(value, where, minimum=None, integer=False):
+    try:
+        ok = not isinstance(value, bool) and math.isfinite(float(value))
+    except (TypeError, ValueError):
+        ok = False
+    if not ok or (integer and float(value) != int(float(value))):
+        raise ValueError(f"{where}: expected {'an integer' if integer else 'a number'}, got {value!r}")
+    if minimum is not None and float(value) < minimum:
+        raise ValueError(f'{where}: must be at least {minimum}, got {value!r}')
+    return value
+
+
+def _array(value, where, ndim):
+    try:
+        arr = np.asarray(value, dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError(f'{where}: expected numbers') from None
+    if arr.ndim not in ndim:
+        raise ValueError(f'{where}: expected a {" or ".join(f"{d}-D" for d in ndim)} array, got shape {arr.shape}')
+    if not np.isfinite(arr).all():
+        bad = np.argwhere(~np.isfinite(arr))[0].tolist()
+        raise ValueError(f'{where}{bad}: expected a finite number')
+    return arr
+
+
+def validate_vrp(cfg):
+    # structural checks with the offending field in the message; returns cfg
+    if not isinstance(cfg, dict):
+        raise ValueError('VRP configuration must be a JSON object')
+    _number(cfg.get('vehicles', 1), 'vehicles', 1, integer=True)
+    _number(cfg.get('max_dist', 0) or 0, 'max_dist', 0)
+    if 'coords' in cfg:
+        coords = _array(cfg['coords'], 'coords', (2,))
+        if coords.shape[1:] != (2,):
+            raise ValueError(f'coords: expected shape (n, 2), got {coords.shape}')
+        n = len(coords)
+        names = cfg.get('names')
+        if names is not None and len(names) != n:
+            raise ValueError(f'names: {len(names)} names for {n} locations')
+    else:
+        locs = cfg.get('locations')
+        if not isinstance(locs, list):
+            raise ValueError('locations: expected a list')
+        for i, loc in enumerate(locs):
+            if not isinstance(loc, dict):
+                raise ValueError(f'locations[{i}]: expected an object')
+            for key in ('x', 'y'):
+                _number(loc.get(key, 0), f'locations[{i}].{key}')
+        n = len(locs)
+    if n < 2:
+        raise ValueError('At least a depot and one customer are required')
+    road = cfg.get('road_network')
+    if road is not None and not isinstance(road, str):
+        raise ValueError(f'road_network: expected a file name, got {road!r}')
+    forbidden = cfg.get('forbidden', '')
+    if not isinstance(forbidden, str):
+        pairs = np.asarray(forbidden)
+        if pairs.size and (pairs.ndim != 2 or pairs.shape[1] != 2):
+            raise ValueError(f'forbidden: expected "a-b,c-d" or (k, 2) pairs, got shape {pairs.shape}')
+    return cfg
+
+
+def validate_pp(cfg):
+    if not isinstance(cfg, dict):
+        raise ValueError('Production-planning configuration must be a JSON object')
+    if 'periods' in cfg:
+        _number(cfg['periods'], 'periods', 0, integer=True)
+    for key in PP_FIELDS:
+        if key in cfg:
+            _number(cfg[key], key, 0 if key.endswith(('cap', 'inv')) else None)
+    products = cfg.get('products')
+    if products is None:
+        _array(cfg.get('demands', []), 'demands', (1,))
+        return cfg
+    if not isinstance(products, list) or not products:
+        raise ValueError('products: expected a non-empty list')
+    for i, pr in enumerate(products):
+        if not isinstance(pr, dict):
+            raise ValueError(f'products[{i}]: expected an object')
+        _array(pr.get('demands', []), f'products[{i}].demands', (1,))
+        for key in PP_FIELDS:
+            if key in pr:
+                _number(pr[key], f'products[{i}].{key}', 0 if key.endswith(('cap', 'inv')) else None)
+    for r, res in enumerate(cfg.get('resources', [])):
+        if not isinstance(res, dict):
+            raise ValueError(f'resources[{r}]: expected an object')
+        _array(res.get('capacity', 0), f'resources[{r}].capacity', (0, 1))
+    return cfg
+
+
+def _stream_csv(path):
+    # header, then rows as they are read (blank lines and # comments skipped)
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = (row for row in csv.reader(f) if row and not row[0].lstrip().startswith('#'))
+        header = [h.strip() for h in next(rows, [])]
+        yield header
+        yield from rows
+
+
+def _vrp_csv(path):
+    rows = _stream_csv(path)
+    header = [h.lower() for h in next(rows)]
+    if 'x' not in header or 'y' not in header:
+        raise ValueError(f'{Path(path).name}: header needs x and y columns')
+    ix, iy = header.index('x'), header.index('y')
+    iname = header.index('name') if 'name' in header else None
+    xy, names = array('d'), []
+    for line, row in enumerate(rows, 2):
+        try:
+            xy.extend((float(row[ix]), float(row[iy])))
+        except (IndexError, ValueError):
+            raise ValueError(f'{Path(path).name} line {line}: bad coordinates {row!r}') from None
+        if iname is not None:
+            names.append(row[iname].strip())
+    cfg = {'coords': np.frombuffer(xy, dtype=float).reshape(-1, 2)}
+    if iname is not None:
+        cfg['names'] = names
+    return cfg
+
+
+def load_vrp(path, **params):
+    # params (vehicles, max_dist, forbidden, ...) fill in keys the file lacks
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.json':
+        cfg = read_json(path)
+    elif suffix == '.csv':
+        cfg = _vrp_csv(path)
+    elif suffix == '.npy':
+        cfg = {'coords': np.load(path, mmap_mode='r')}
+    elif suffix == '.npz':
+        with np.load(path) as data:
+            cfg = {'coords': data['coords']}
+            if 'names' in data:
+                cfg['names'] = data['names'].tolist()
+            for key in ('vehicles', 'max_dist'):
+                if key in data:
+                    cfg[key] = data[key].item()
+            if 'forbidden' in data:
+                cfg['forbidden'] = data['forbidden'].tolist()
+    else:
+        raise ValueError(f'Unsupported instance format: {path.suffix} (use one of {", ".join(FORMATS)})')
+    for key, value in params.items():
+        cfg.setdefault(key, value)
+    if cfg.get('road_network'):
+        # a relative road network file is next to the instance
+        cfg['road_network'] = str(path.parent / cfg['road_network'])
+    return validate_vrp(cfg)
+
+
+def _pp_csv(path):
+    rows = _stream_csv(path)
+    header = next(rows)
+    skip = 1 if header and header[0].lower() == 'period' else 0
+    columns = header[skip:]
+    if not columns:
+        raise ValueError(f'{Path(path).name}: header needs one demand column per product')
+    values = array('d')
+    for line, row in enumerate(rows, 2):
+        try:
+            values.extend(float(v) for v in row[skip:skip + len(columns)])
+        except ValueError:
+            raise ValueError(f'{Path(path).name} line {line}: bad demand {row!r}') from None
+        if len(row) - skip < len(columns):
+            raise ValueError(f'{Path(path).name} line {line}: {len(row) - skip} values for {len(columns)} products')
+    return np.frombuffer(values, dtype=float).reshape(-1, len(columns)).T, columns
+
+
+def pp_config(demands, names=None, **params):
+    # (T,) demands -> single-product config, (P, T) -> products; per-product
+    # arrays in params go to the products, scalars stay top-level defaults
+    demands = np.asarray(demands, dtype=float)
+    if demands.ndim == 1:
+        return dict(params, periods=params.get('periods', demands.shape[0]), demands=demands)
+    P, T = demands.shape
+    names = list(names) if names is not None else [f'Product{i + 1}' for i in range(P)]
+    products = [{'name': str(name), 'demands': d} for name, d in zip(names, demands)]
+    cfg = {'periods': params.pop('periods', T)}
+    for key, value in params.items():
+        if np.ndim(value):
+            for pr, v in zip(products, np.asarray(value, dtype=float)):
+                pr[key] = float(v)
+        else:
+            cfg[key] = value
+    cfg['products'] = products
+    return cfg
+
+
+def load_pp(path, **params):
+    # params (prod_cost, inv_cap, ...) fill in keys the file lacks
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.json':
+        cfg = read_json(path)
+        for key, value in params.items():
+            cfg.setdefault(key, value)
+    elif suffix == '.csv':
+        demands, names = _pp_csv(path)
+        if len(names) == 1:
+            demands = demands[0]
+        cfg = pp_config(demands, names, **params)
+    elif suffix == '.npy':
+        cfg = pp_config(np.load(path, mmap_mode='r'), **params)
+    elif suffix == '.npz':
+        with np.load(path) as data:
+            arrays = {key: data[key] for key in data.files}
+        names = arrays.pop('names', None)
+        fields = {key: (value.item() if value.ndim == 0 else value) for key, value in arrays.items() if key != 'demands'}
+        cfg = pp_config(arrays['demands'], names, **dict(params, **fields))
+    else:
+        raise ValueError(f'Unsupported instance format: {path.suffix} (use one of {", ".join(FORMATS)})')
+    return validate_pp(cfg)
+
+
+def save_vrp_npz(path, cfg):
+    cfg = validate_vrp(cfg)
+    if 'coords' in cfg:
+        coords, names = np.asarray(cfg['coords'], dtype=float), cfg.get('names')
+    else:
+        coords = np.array([[float(loc.get('x', 0)), float(loc.get('y', 0))] for loc in cfg['locations']])
+        names = [loc.get('name', '') for loc in cfg['locations']]
+    arrays = {'coords': coords, 'vehicles': int(cfg.get('vehicles', 1)), 'max_dist': float(cfg.get('max_dist', 0) or 0)}
+    if names is not None:
+        arrays['names'] = np.array(names, dtype=str)
+    forbidden = cfg.get('forbidden', '')
+    if isinstance(forbidden, str):
+        forbidden = [tuple(map(int, pair.split('-'))) for pair in forbidden.split(',') if '-' in pair]
+    arrays['forbidden'] = np.asarray(forbidden, dtype=np.int64).reshape(-1, 2)
+    np.savez_compressed(path, **arrays)
+
+
+def save_pp_npz(path, cfg):
+    # resources have no array form: keep those instances in JSON
+    cfg = validate_pp(cfg)
+    if cfg.get('resources'):
+        raise ValueError('Instances with shared resources are saved as JSON')
+    products = cfg.get('products') or [dict(cfg, name=cfg.get('name') or 'Product')]
+    T = int(cfg.get('periods', min(len(pr.get('demands', [])) for pr in products)))
+    arrays = {'demands': np.array([np.asarray(pr.get('demands', []), dtype=float)[:T] for pr in products]),
+              'names': np.array([pr.get('name', '') for pr in products], dtype=str)}
+    for key in PP_FIELDS:
+        arrays[key] = np.array([float(pr.get(key, cfg.get(key, PP_DEFAULTS[key]))) for pr in products])
+    if 'products' not in cfg:
+        arrays['demands'] = arrays['demands'][0]
+        arrays.pop('names')
+        arrays.update({key: value[0] for key, value in arrays.items() if key in PP_FIELDS})
+    np.savez_compressed(path, **arrays)
@@ -0,0 +1,127 @@
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+from functools import lru_cache
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+# min c @ v  s.t.  A @ v (sense) rhs,  lb <= v <= ub
+# sense holds '<', '>' or '=' per row and vtype 'C' or 'B' per column (Gurobi's codes)
+LinearProgram = namedtuple('LinearProgram', 'c A sense rhs lb ub vtype')
+
+BACKENDS = ('auto', 'gurobi', 'highs')
+# variables and constraints allowed by Gurobi's size-limited licence
+GUROBI_SIZE_LIMIT = 2000
+HIGHS_STATUS = {0: 'optimal', 1: 'time_limit', 2: 'infeasible', 3: 'unbounded'}
+
+
+class RowBuilder:
+    # Collects constraint rows block by block as COO triplets and stacks them
+    # into one CSR matrix, so a whole family of constraints costs a few NumPy
+    # operations instead of one addConstr call per row.
+
+    def __init__(self, ncols):
+        self.ncols = ncols
+        self.nrows = 0
+        self.rows, self.cols, self.vals = [], [], []
+        self.sense, self.rhs = [], []
+
+    def add(self, rows, cols, vals, sense, rhs):
+        # rows are numbered within the block (0 .. len(rhs) - 1); returns the
+        # block's position in the final matrix
+        rhs = np.atleast_1d(np.asarray(rhs, dtype=float))
+        rows = np.asarray(rows, dtype=np.int64)
+        self.rows.append(rows + self.nrows)
+        self.cols.append(np.asarray(cols, dtype=np.int64))
+        self.vals.append(np.broadcast_to(np.asarray(vals, dtype=float), rows.shape))
+        self.sense.append(np.full(len(rhs), sense))
+        self.rhs.append(rhs)
+        block = slice(self.nrows, self.nrows + len(rhs))
+        self.nrows += len(rhs)
+        return block
+
+    def add_matrix(self, A, sense, rhs, col=0):
+        # a ready-made sparse block whose first column is `col`
+        A = sp.coo_matrix(A)
+        return self.add(A.row, A.col + col, A.data, sense, rhs)
+
+    def build(self):
+        if not self.rhs:
+            return sp.csr_matrix((0, self.ncols)), np.empty(0, dtype='<U1'), np.empty(0)
+        A = sp.csr_matrix(
+            (np.concatenate(self.vals), (np.concatenate(self.rows), np.concatenate(self.cols))),
+            shape=(self.nrows, self.ncols),
+        )
+        return A, np.concatenate(self.sense), np.concatenate(self.rhs)
+
+
+def add_to_gurobi(model, lp, name='v', telemetry=None):
+    # one addMVar + one addMConstr for the whole program; returns the MVar.
+    # With a telemetry.Telemetry the two calls are timed as the 'variables'
+    # and 'constraints' phases and the model size is recorded.
+    timed = telemetry.phase if telemetry is not None else lambda _: nullcontext()
+    with timed('variables'):
+        v = model.addMVar(len(lp.c), lb=lp.lb, ub=lp.ub, obj=lp.c, vtype=lp.vtype, name=name)
+    with timed('constraints'):
+        if lp.A.shape[0]:
+            model.addMConstr(lp.A, v, lp.sense, lp.rhs)
+    if telemetry is not None:
+        telemetry.program(lp)
+    return v
+
+
+@lru_cache(maxsize=None)
+def gurobi_size_limit():
+    # None if Gurobi takes any size, GUROBI_SIZE_LIMIT under the size-limited
+    # licence, 0 when no licence can be obtained at all; probed once
+    try:
+        import gurobipy
+        with gurobipy.Env(params={'OutputFlag': 0}) as env, gurobipy.Model(env=env) as model:
+            model.addMVar(GUROBI_SIZE_LIMIT + 1)
+            model.optimize()
+    except ImportError:
+        return 0
+    except Exception as e:
+        return GUROBI_SIZE_LIMIT if getattr(e, 'errno', None) == 10010 else 0
+    return None
+
+
+def pick_backend(lp, backend='auto'):
+    # 'auto': Gurobi when its licence can take the model, HiGHS otherwise
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    if backend != 'auto':
+        return backend
+    limit = gurobi_size_limit()
+    if limit is None or max(lp.A.shape) <= limit:
+        return 'gurobi' if limit != 0 else 'highs'
+    return 'highs'
+
+
+def solve_highs(lp, time_limit=None, mip_gap=None, verbose=False):
+    # HiGHS through scipy.optimize.milp on the same matrices; pure LPs go
+    # through the same call. No callbacks: no lazy cuts, progress or cancel.
+    # Returns {'status', 'x', 'objective', 'bound', 'gap', 'runtime', 'nodes'}.
+    lo = np.where(lp.sense == '<', -np.inf, lp.rhs)
+    hi = np.where(lp.sense == '>', np.inf, lp.rhs)
+    options = {'disp': bool(verbose)}
+    if time_limit is not None:
+        options['time_limit'] = float(time_limit)
+    if mip_gap is not None:
+        options['mip_rel_gap'] = float(mip_gap)
+    constraints = [LinearConstraint(lp.A, lo, hi)] if lp.A.shape[0] else []
+    clock = time.perf_counter()
+    res = milp(lp.c, integrality=(np.asarray(lp.vtype) != 'C').astype(int), bounds=Bounds(lp.lb, lp.ub),
+               constraints=constraints, options=options)
+    runtime = time.perf_counter() - clock
+    found = res.x is not None
+    return {
+        'status': HIGHS_STATUS.get(res.status, 'error'),
+        'x': res.x,
+        'objective': float(res.fun) if found else None,
+        'bound': getattr(res, 'mip_dual_bound', None),
+        'gap': getattr(res, 'mip_gap', None) if found else None,
+        'runtime': runtime,
+        'nodes': getattr(res, 'mip_node_count', None),
+    }
@@ -0,0 +1,49 @@
+import tkinter as tk
+from tkinter import ttk
+import customtkinter as ctk
+
+
+class PagedTable(ctk.CTkFrame):
+    # Read-only view of a large table, one page at a time: only the rows on
+    # screen exist as widgets, so 10 or 10^6 rows cost the same to show.
+    # row(i) returns the values of row i (0 <= i < nrows) in column order.
+
+    def __init__(self, master, columns, nrows, row, page_size=50, **kwargs):
+        super().__init__(master, **kwargs)
+        self.nrows, self.row, self.page_size = nrows, row, page_size
+        self.pages = max(1, -(-nrows // page_size))
+        self.page = 0
+
+        style = ttk.Style(self)
+        style.configure('Paged.Treeview', background='#2b2b2b', fieldbackground='#2b2b2b', foreground='#ffffff',
+                        rowheight=22, borderwidth=0)
+        style.configure('Paged.Treeview.Heading', background='#181c22', foreground='#00e676', relief='flat')
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', style='Paged.Treeview',
+                                 height=min(page_size, 12))
+        for c in columns:
+            self.tree.heading(c, text=c)
+            self.tree.column(c, width=max(60, 560 // len(columns)), anchor=tk.E if c != columns[0] else tk.W)
+        scroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+
+        nav = ctk.CTkFrame(self, fg_color='transparent')
+        nav.pack(side=tk.BOTTOM, fill=tk.X, pady=(4, 0))
+        for text, step in (('«', -self.pages), ('‹', -1)):
+            ctk.CTkButton(nav, text=text, width=32, command=lambda s=step: self.show(self.page + s)).pack(side=tk.LEFT, padx=2)
+        self.label = ctk.CTkLabel(nav, text='')
+        self.label.pack(side=tk.LEFT, expand=True)
+        for text, step in (('»', self.pages), ('›', 1)):
+            ctk.CTkButton(nav, text=text, width=32, command=lambda s=step: self.show(self.page + s)).pack(side=tk.RIGHT, padx=2)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.show(0)
+
+    def show(self, page):
+        self.page = min(max(page, 0), self.pages - 1)
+        self.tree.delete(*self.tree.get_children())
+        first = self.page * self.page_size
+        last = min(first + self.page_size, self.nrows)
+        for i in range(first, last):
+            self.tree.insert('', tk.END, values=[f'{v:.6g}' if isinstance(v, float) else v for v in self.row(i)])
+        self.label.configure(text=f'Rows {first + 1 if self.nrows else 0}-{last} of {self.nrows} '
+                                  f'(page {self.page + 1}/{self.pages})')
@@ -0,0 +1,141 @@
+import numpy as np
+from matplotlib import style
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import hsv_to_rgb
+from matplotlib.figure import Figure
+
+# Figures for the apps. Each window owns one figure for its whole life and
+# redraws it by swapping data into the existing artists; figures are built
+# with matplotlib.figure.Figure, not pyplot, so nothing keeps them alive once
+# their window is gone.
+
+# golden-ratio hue steps: any number of routes, neighbours far apart in hue
+GOLDEN = 0.618033988749895
+# a line plot keeps at most this many points per pixel column of the axes
+POINTS_PER_PIXEL = 2
+# markers only while the points can be told apart
+MAX_MARKERS = 60
+
+
+def route_colours(n):
+    hue = (np.arange(n) * GOLDEN) % 1
+    value = np.where(np.arange(n) % 2, 0.8, 1.0)
+    return hsv_to_rgb(np.column_stack([hue, np.full(n, 0.75), value]))
+
+
+def route_segments(coords, routes):
+    # one polyline per route (depot ... depot), as LineCollection takes them
+    coords = np.asarray(coords, dtype=float)
+    return [coords[r] for r in routes]
+
+
+def envelope(y, buckets):
+    # indices keeping the min and max of each of `buckets` runs of y, in
+    # order: the downsampled line has the same peaks and troughs
+    y = np.asarray(y, dtype=float)
+    if len(y) <= 2 * buckets:
+        return np.arange(len(y))
+    edges = np.linspace(0, len(y), buckets + 1).astype(int)
+    lo = np.minimum.reduceat(y, edges[:-1])
+    hi = np.maximum.reduceat(y, edges[:-1])
+    idx = []
+    for start, stop, a, b in zip(edges[:-1], edges[1:], lo, hi):
+        run = y[start:stop]
+        i, j = start + int(np.argmax(run == a)), start + int(np.argmax(run == b))
+        idx.extend((i, j) if i <= j else (j, i))
+    return np.array(idx)
+
+
+class RouteFigure:
+    # stops, depot and every route of a VRP solution: one scatter, one marker
+    # and a single LineCollection, whatever the number of routes. show()
+    # redraws everything; routes() swaps in an incumbent's routes and blits
+    # just the axes, for updates while a solve runs.
+
+    def __init__(self, master, size=(6, 6)):
+        with style.context('dark_background'):
+            self.fig = Figure(figsize=size)
+            self.ax = self.fig.add_subplot()
+            self.ax.set_facecolor('#2b2b2b')
+            self.ax.grid(True, color='gray', linestyle='--', alpha=0.5)
+            # animated: left out of full draws, drawn over the saved background
+            self.lines = LineCollection([], linewidths=1.5, animated=True)
+            self.ax.add_collection(self.lines)
+            self.stops = self.ax.scatter([], [], s=14, color='#dddddd', zorder=3)
+            self.depot = self.ax.scatter([], [], s=70, marker='s', color='#00e676', zorder=4)
+        self.coords = None
+        self.background = None
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.get_tk_widget().pack(fill='both', expand=True)
+
+    def _on_draw(self, _):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.lines)
+
+    def show(self, coords, routes):
+        coords = np.asarray(coords, dtype=float)
+        self.coords = coords
+        self.stops.set_offsets(coords[1:])
+        self.depot.set_offsets(coords[:1])
+        self._set_routes(routes)
+        lo, hi = coords.min(axis=0), coords.max(axis=0)
+        pad = np.maximum((hi - lo) * 0.05, 1e-9)
+        self.ax.set_xlim(lo[0] - pad[0], hi[0] + pad[0])
+        self.ax.set_ylim(lo[1] - pad[1], hi[1] + pad[1])
+        self.background = None
+        self.canvas.draw_idle()
+
+    def routes(self, routes):
+        if self.background is None:
+            # nothing to blit onto yet: the pending full draw will show them
+            self._set_routes(routes)
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self._set_routes(routes)
+        self.ax.draw_artist(self.lines)
+        self.canvas.blit(self.ax.bbox)
+
+    def _set_routes(self, routes):
+        self.lines.set_segments(route_segments(self.coords, routes))
+        self.lines.set_color(route_colours(len(routes)))
+
+
+class LineFigure:
+    # a few named series against a shared x axis. show() replaces the data of
+    # the existing lines; long series are cut down to a min/max envelope a
+    # couple of points per pixel wide, so 10^5 periods draw as fast as 10^3.
+
+    def __init__(self, master, size=(5, 3)):
+        self.fig = Figure(figsize=size)
+        self.ax = self.fig.add_subplot()
+        self.lines = {}
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.canvas.get_tk_widget().pack(padx=10, pady=5)
+
+    def show(self, x, series, xlabel='', ylabel='', title='', markers=('o', 'x', '.')):
+        x = np.asarray(x, dtype=float)
+        buckets = max(1, int(self.ax.bbox.width) * POINTS_PER_PIXEL // 2)
+        for name in set(self.lines) - set(series):
+            self.lines.pop(name).remove()
+        for (name, y), marker in zip(series.items(), markers * len(series)):
+            y = np.asarray(y, dtype=float)
+            idx = envelope(y, buckets)
+            line = self.lines.get(name)
+            if line is None:
+                line, = self.ax.plot([], [], label=name)
+                self.lines[name] = line
+            line.set_data(x[idx], y[idx])
+            line.set_marker(marker if len(idx) <= MAX_MARKERS else '')
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.ax.set_title(title)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        if len(series) > 1:
+            self.ax.legend()
+        elif self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+        self.canvas.draw_idle()
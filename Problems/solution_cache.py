@@ -0,0 +1,76 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PATH = Path.home() / '.ro_gl3' / 'solutions.sqlite'
+
+
+def canonical_hash(obj):
+    # stable digest of a JSON-serialisable instance description
+    text = json.dumps(obj, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class SolutionCache:
+    # On-disk store of solved instances. Entries are looked up by an exact key
+    # (hash of the whole instance) or, for warm starts, by a coarser "family"
+    # (e.g. same locations, same horizon). Least recently used entries are
+    # evicted once max_entries is exceeded.
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=1000):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        # used from the GUI worker thread as well as the Tk thread
+        self.conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS solutions ('
+                'key TEXT PRIMARY KEY, kind TEXT, family TEXT, payload TEXT, used REAL)'
+            )
+            self.conn.execute('CREATE INDEX IF NOT EXISTS family_idx ON solutions (kind, family, used)')
+
+    def get(self, kind, key):
+        with self.lock, self.conn:
+            row = self.conn.execute('SELECT payload FROM solutions WHERE kind = ? AND key = ?', (kind, key)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute('UPDATE solutions SET used = ? WHERE key = ?', (time.time(), key))
+        return json.loads(row[0])
+
+    def nearest(self, kind, family):
+        # most recently used entry of the same family
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT payload FROM solutions WHERE kind = ? AND family = ? ORDER BY used DESC LIMIT 1',
+                (kind, family)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, kind, key, family, payload):
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO solutions (key, kind, family, payload, used) VALUES (?, ?, ?, ?, ?)',
+                (key, kind, family, json.dumps(payload), time.time())
+            )
+            count = self.conn.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    'DELETE FROM solutions WHERE key IN (SELECT key FROM solutions ORDER BY used ASC LIMIT ?)',
+                    (count - self.max_entries,)
+                )
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM solutions')
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
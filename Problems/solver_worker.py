@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+from startup import lazy
+
+gurobipy = lazy('gurobipy')
+
+
+class SolverWorker:
+    # One long-lived solver thread shared by the apps hosted in a process.
+    # The Gurobi environment (licence check, parameter defaults) is created
+    # once, on that thread, and every model is built in it; jobs run one at
+    # a time in submission order so no two models share the Env concurrently.
+    # submit(fn, *args, **kwargs) runs fn(*args, env=env, **kwargs) on the
+    # worker and returns a concurrent.futures.Future; env is None when the
+    # Env could not be created.
+
+    def __init__(self):
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='solver')
+        self.env = None
+
+    def _run(self, fn, args, kwargs):
+        if self.env is None:
+            try:
+                self.env = gurobipy.Env()
+            except Exception:
+                # no licence or no gurobipy: fn still runs, with the default
+                # Env, and reports the failure through its own channel (or
+                # solves with a backend that needs no Gurobi)
+                pass
+        return fn(*args, env=self.env, **kwargs)
+
+    def submit(self, fn, *args, **kwargs):
+        return self.pool.submit(self._run, fn, args, kwargs)
+
+    def warm(self):
+        # start the Env now so the first solve does not pay for it
+        return self.submit(lambda env: None)
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        if self.env is not None:
+            self.env.dispose()
+            self.env = None
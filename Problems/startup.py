@@ -0,0 +1,91 @@
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+import types
+
+PROFILE_ENV = 'RO_GL3_PROFILE_STARTUP'
+FIRST_FRAME = 'first frame:'
+
+
+class LazyModule(types.ModuleType):
+    # Stands in for a module until one of its attributes is used; the real
+    # import happens then (once, under the import system's own lock).
+    # lazy('matplotlib.pyplot') behaves like `import matplotlib.pyplot`
+    # except for the time it is paid.
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def __getattr__(self, attr):
+        module = self.__dict__.get('_module')
+        if module is None:
+            module = self.__dict__['_module'] = importlib.import_module(self.__name__)
+        return getattr(module, attr)
+
+
+def lazy(name):
+    return LazyModule(name)
+
+
+def prewarm(root, *names):
+    # import `names` on a background thread once the window has drawn, so the
+    # first solve or plot does not wait for them
+    def load():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass  # the real use will raise it again where it can be shown
+
+    root.after_idle(lambda: threading.Thread(target=load, name='prewarm', daemon=True).start())
+
+
+def first_frame(root):
+    # under --profile-startup: report when the window is on screen, then quit
+    start = os.environ.get(PROFILE_ENV)
+    if not start:
+        return
+
+    def done():
+        root.update()
+        print(f'{FIRST_FRAME} {1e3 * (time.time() - float(start)):.0f} ms', file=sys.stderr, flush=True)
+        root.destroy()
+
+    root.after_idle(done)
+
+
+def importtime_report(lines, top=15):
+    # `python -X importtime` lines up to the first frame -> (modules, total
+    # µs, top-level imports sorted by cumulative time as (cumulative, self, name))
+    rows = []
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), int(self_us), name.rstrip()))
+    heads = sorted((r for r in rows if not r[2].startswith('  ')), reverse=True)
+    return len(rows), sum(r[1] for r in rows), heads[:top]
+
+
+def profile_startup(script, argv=()):
+    # re-runs `script` with -X importtime until its first frame and prints how
+    # long that took and which imports it waited for
+    env = dict(os.environ, **{PROFILE_ENV: repr(time.time())})
+    proc = subprocess.run([sys.executable, '-X', 'importtime', str(script), *argv],
+                          env=env, stderr=subprocess.PIPE, text=True)
+    lines = proc.stderr.splitlines()
+    frame = next((i for i, line in enumerate(lines) if line.startswith(FIRST_FRAME)), None)
+    if frame is None:
+        sys.stderr.write('\n'.join(line for line in lines if not line.startswith('import time:')) + '\n')
+        print('startup profile: the window never appeared', file=sys.stderr)
+        return proc.returncode or 1
+    count, total, heads = importtime_report(lines[:frame])
+    print(f'time to first frame: {lines[frame][len(FIRST_FRAME):].strip()}')
+    print(f'imports before first frame: {count} modules, {total / 1e3:.0f} ms')
+    print(f'{"cumulative":>12} {"self":>9}  module')
+    for cumulative, self_us, name in heads:
+        print(f'{cumulative / 1e3:>9.1f} ms {self_us / 1e3:>6.1f} ms  {name.strip()}')
+    return 0
@@ -0,0 +1,182 @@
+import json
+import math
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Per-solve instrumentation shared by the VRP and production-planning solvers.
+# A Telemetry collects the wall time of each phase (parse, distance, formulate,
+# variables, constraints, optimize, extract, plotting, ...), the model size
+# and the search statistics of a Gurobi solve (nodes, simplex iterations,
+# incumbent/bound trajectory, time to first feasible solution, lazy
+# constraints added per round, Gurobi's own cutting planes), and ends up in
+# result['telemetry'] as a plain dict.
+#
+# emit(record) appends it to the file named by $RO_GL3_TELEMETRY: JSON lines,
+# or Prometheus text format (gauges of the latest solve per label set,
+# for node_exporter's textfile collector) when the name ends in .prom.
+#   python telemetry.py solves.jsonl  -> the same records as Prometheus text
+
+TELEMETRY_ENV = 'RO_GL3_TELEMETRY'
+PREFIX = 'ro_gl3'
+# trajectory points kept per solve (the first ones and the latest ones)
+MAX_TRAJECTORY = 200
+
+
+class Telemetry:
+
+    def __init__(self, kind, **labels):
+        self.kind = kind
+        self.labels = labels
+        # phase -> seconds; also handed out as result['timings']
+        self.phases = {}
+        self.model = {}
+        self.search = {}
+        self.trajectory = []
+        self.first_feasible = None
+        # callback rounds that rejected an incumbent, the lazy constraints
+        # they added in all and per round (the first rounds and the latest ones)
+        self.lazy_rounds = self.lazy_constraints = 0
+        self.lazy_cuts = []
+        # cutting planes and nodes as of the latest MIP callback
+        self.cuts = self.callback_nodes = None
+
+    @contextmanager
+    def phase(self, name):
+        clock = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - clock
+
+    def model_size(self, variables, constraints, nonzeros):
+        self.model = {'variables': int(variables), 'constraints': int(constraints), 'nonzeros': int(nonzeros)}
+
+    def gurobi_model(self, model):
+        model.update()
+        self.model_size(model.NumVars, model.NumConstrs, model.NumNZs)
+
+    def program(self, lp):
+        # a matrix_form.LinearProgram, for solvers that never see a Gurobi model
+        self.model_size(len(lp.c), lp.A.shape[0], lp.A.nnz)
+
+    def incumbent(self, runtime, objective, bound, nodes):
+        # one point of the incumbent/bound trajectory, from a solver callback
+        if self.first_feasible is None and objective is not None and math.isfinite(objective):
+            self.first_feasible = runtime
+        if len(self.trajectory) >= MAX_TRAJECTORY:
+            del self.trajectory[MAX_TRAJECTORY // 2]
+        self.trajectory.append([runtime, objective, bound, nodes])
+
+    def lazy_round(self, added):
+        self.lazy_rounds += 1
+        self.lazy_constraints += int(added)
+        if len(self.lazy_cuts) >= MAX_TRAJECTORY:
+            del self.lazy_cuts[MAX_TRAJECTORY // 2]
+        self.lazy_cuts.append(int(added))
+
+    def mip_progress(self, cuts, nodes):
+        # MIP_CUTCNT / MIP_NODCNT, from a Gurobi MIP callback
+        self.cuts, self.callback_nodes = int(cuts), int(nodes)
+
+    def gurobi_search(self, model):
+        # statistics Gurobi keeps itself, read once optimize() returns
+        self.search = {'nodes': int(model.NodeCount), 'iterations': int(model.IterCount), 'solutions': model.SolCount,
+                       'runtime': model.Runtime}
+        if model.IsMIP and model.SolCount:
+            self.search['bound'] = model.ObjBound
+
+    def highs_search(self, res):
+        # a matrix_form.solve_highs result
+        self.search = {key: res[key] for key in ('nodes', 'runtime', 'bound') if res.get(key) is not None}
+
+    def record(self, **fields):
+        # the JSON-ready form; fields (status, objective, gap, size, ...) go on top
+        search = dict(self.search, lazy_rounds=self.lazy_rounds, lazy_constraints=self.lazy_constraints,
+                      lazy_per_round=self.lazy_cuts, cuts=self.cuts, callback_nodes=self.callback_nodes,
+                      time_to_first_feasible=self.first_feasible, trajectory=self.trajectory)
+        return dict({'ts': time.time(), 'kind': self.kind, 'labels': self.labels}, **fields,
+                    phases=self.phases, model=self.model, search=search)
+
+
+def emit(record, path=None):
+    path = path or os.environ.get(TELEMETRY_ENV)
+    if not path or record is None:
+        return
+    if str(path).endswith('.prom'):
+        _latest[_key(record)] = record
+        text = prometheus(_latest.values())
+        tmp = Path(f'{path}.tmp')
+        tmp.write_text(text, encoding='utf-8')
+        os.replace(tmp, path)
+    else:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, default=float) + '\n')
+
+
+# latest record per label set, for the .prom file of this process
+_latest = {}
+
+
+def _key(record):
+    return record['kind'], tuple(sorted(record['labels'].items()))
+
+
+METRICS = [
+    # name, help, value of a record
+    ('phase_seconds', 'Wall time of a solve phase', None),
+    ('runtime_seconds', 'Solver runtime', lambda r: r['search'].get('runtime')),
+    ('objective', 'Objective value of the returned solution', lambda r: r.get('objective')),
+    ('gap', 'Relative MIP gap of the returned solution', lambda r: r.get('gap')),
+    ('model_variables', 'Variables in the model', lambda r: r['model'].get('variables')),
+    ('model_constraints', 'Constraints in the model', lambda r: r['model'].get('constraints')),
+    ('model_nonzeros', 'Nonzeros in the constraint matrix', lambda r: r['model'].get('nonzeros')),
+    ('nodes', 'Branch-and-bound nodes explored',
+     lambda r: r['search'].get('nodes', r['search'].get('callback_nodes'))),
+    ('iterations', 'Simplex iterations', lambda r: r['search'].get('iterations')),
+    ('lazy_rounds', 'Incumbents rejected by lazy cuts', lambda r: r['search'].get('lazy_rounds')),
+    ('lazy_constraints', 'Lazy constraints added', lambda r: r['search'].get('lazy_constraints')),
+    ('cuts', 'Cutting planes applied by the solver', lambda r: r['search'].get('cuts')),
+    ('time_to_first_feasible_seconds', 'Solver time until the first feasible solution',
+     lambda r: r['search'].get('time_to_first_feasible')),
+    ('last_solve_timestamp_seconds', 'When the solve finished', lambda r: r['ts']),
+]
+
+
+def _labels(labels):
+    escape = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def prometheus(records):
+    # latest record per label set -> Prometheus text exposition format
+    latest = {}
+    for r in records:
+        latest[_key(r)] = r
+    lines = []
+    for name, doc, value in METRICS:
+        metric = f'{PREFIX}_{name}'
+        lines += [f'# HELP {metric} {doc}', f'# TYPE {metric} gauge']
+        for r in latest.values():
+            labels = dict(kind=r['kind'], **r['labels'])
+            if value is None:
+                for phase, seconds in r['phases'].items():
+                    lines.append(f'{metric}{_labels(dict(labels, phase=phase))} {seconds:.6g}')
+                continue
+            v = value(r)
+            if v is not None:
+                lines.append(f'{metric}{_labels(labels)} {float(v):.10g}')
+    return '\n'.join(lines) + '\n'
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit('usage: python telemetry.py solves.jsonl')
+    sys.stdout.write(prometheus(read_jsonl(sys.argv[1])))